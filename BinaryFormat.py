@@ -0,0 +1,71 @@
+"""
+Layout of the binary column files written by Writers.BinaryDataWriter and read by Readers.BinaryDataReader
+
+The file starts with MAGIC, the size of the header as a little endian uint64 and the header, a JSON
+dict of the column names, units, dtypes and parameters padded to ALIGNMENT bytes. It is followed by
+chunks of data points. A chunk starts with CHUNK_MAGIC, its capacity and its number of data points
+(little endian uint64) padded to ALIGNMENT bytes, then holds one block of capacity values per column,
+each block starting on ALIGNMENT bytes. The number of data points of a chunk is updated after
+its values are written, so a file can be read while data points are appended.
+"""
+
+import json
+
+import numpy as np
+
+MAGIC = b'ADFBIN01'
+CHUNK_MAGIC = b'ADFCHUNK'
+ALIGNMENT = 64
+CHUNK_HEAD_DTYPE = np.dtype([('magic','S8'),('capacity','<u8'),('length','<u8')])
+
+def aligned(size):
+    """ Smallest multiple of ALIGNMENT larger or equal to size """
+
+    return -(-size//ALIGNMENT)*ALIGNMENT
+
+def file_dtype(dtype):
+    """ Little endian dtype used to store a column, float64 for None """
+
+    return np.dtype(dtype).newbyteorder('<') if dtype is not None else np.dtype('<f8')
+
+def encode_header(column_names,column_units,column_dtypes,parameter_dict):
+    """ Bytes of the file header, up to the first chunk """
+
+    header = {
+        'column_names' : list(column_names),
+        'column_units' : list(column_units),
+        'column_dtypes' : [file_dtype(dtype).str for dtype in column_dtypes],
+        'parameters' : parameter_dict,
+        }
+    text = json.dumps(header,default = str).encode('utf-8')
+    size = aligned(len(MAGIC) + 8 + len(text)) - len(MAGIC) - 8
+
+    return MAGIC + np.uint64(size).astype('<u8').tobytes() + text.ljust(size)
+
+def decode_header(head):
+    """ Header dict and byte offset of the first chunk from the first bytes of a file """
+
+    if head[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a binary data file')
+    size = int(np.frombuffer(head[len(MAGIC):len(MAGIC) + 8],dtype = '<u8')[0])
+    header = json.loads(bytes(head[len(MAGIC) + 8:len(MAGIC) + 8 + size]).decode('utf-8'))
+
+    return header, len(MAGIC) + 8 + size
+
+def chunk_layout(capacity,dtypes):
+    """ Offsets of the column blocks from the chunk start and size of a chunk """
+
+    offsets = list()
+    size = aligned(CHUNK_HEAD_DTYPE.itemsize)
+    for dtype in dtypes:
+        offsets.append(size)
+        size += aligned(capacity*np.dtype(dtype).itemsize)
+
+    return offsets, size
+
+def chunk_head(capacity,length):
+    """ Bytes of a chunk head """
+
+    head = np.array([(CHUNK_MAGIC,capacity,length)],dtype = CHUNK_HEAD_DTYPE).tobytes()
+
+    return head.ljust(aligned(len(head)),b'\0')
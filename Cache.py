@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .DataContainer import DataCurve, Column
+
+# Prefix of the directories where the entries are written before being renamed
+TEMPORARY_PREFIX = '.tmp-'
+
+def default_cache_dir():
+    """ Default cache directory in the user cache folder """
+
+    cache_home = os.environ.get('XDG_CACHE_HOME',os.path.join(os.path.expanduser('~'),'.cache'))
+
+    return os.path.join(cache_home,'AsciiDataFile')
+
+class SidecarCache(object):
+    """ Binary copies of parsed data files
+
+    Each entry is a directory holding one .npy file per array and a meta.json file with the
+    column names, units, parameters and the size and modification time of the source file.
+    Entries are memory mapped copy-on-write when loaded (the arrays can be edited in place without
+    changing the entry) and discarded when the source file is modified or removed or when the reader
+    configuration changes. The least recently used entries are evicted above max_size bytes.
+    Besides DataCurves, the cache holds the line indexes used to read row ranges.
+
+    The cache can be shared by several processes (ex : read_many). An entry is written in a temporary 
+    directory renamed when complete, and an entry removed by another process is a cache miss : 
+    the cache never makes a read fail.
+    """
+
+    def __init__(self,cache_dir = None,max_size = 2**30):
+        """ Initialize a SidecarCache
+
+        cache_dir : directory of the cache (default to default_cache_dir())
+        max_size : maximal size of the cache in bytes
+        """
+
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        os.makedirs(self.cache_dir,exist_ok = True)
+
+    def _entry_path(self,file_path,configuration):
+
+        key = repr((os.path.abspath(file_path),sorted(configuration.items())))
+
+        return os.path.join(self.cache_dir,hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def _entry_paths(self):
+
+        for entry_name in os.listdir(self.cache_dir):
+            if entry_name.startswith(TEMPORARY_PREFIX):
+                continue
+            entry_path = os.path.join(self.cache_dir,entry_name)
+            if os.path.isfile(os.path.join(entry_path,'meta.json')):
+                yield entry_path
+
+    def load(self,file_path,configuration):
+        """ Load the cached DataCurve of a file
+
+        file_path : full path to the data file
+        configuration : dict describing the reader settings (see Reader.get_configuration)
+
+        Return a DataCurve with memory mapped columns or None if there is no valid entry
+        """
+
+        entry = self._load_entry(file_path,configuration)
+        if entry is None:
+            return None
+
+        meta, arrays = entry
+        column_dict = dict()
+        for column_name, column_units, data in zip(meta['column_names'],meta['column_units'],arrays):
+            column = Column(column_name,column_units)
+            column.set_data(data,copy = False)
+            column.update_length()
+            column_dict[column_name] = column
+
+        data_curve = DataCurve(column_dict = column_dict)
+        data_curve.set_parameter_dict(meta['parameters'])
+
+        return data_curve
+
+    def store(self,file_path,configuration,data_curve):
+        """ Store the DataCurve of a file
+
+        file_path : full path to the data file
+        configuration : dict describing the reader settings (see Reader.get_configuration)
+        data_curve : DataCurve read from the file
+        """
+
+        meta = {
+            'column_names' : data_curve.get_column_names(),
+            'column_units' : data_curve.get_column_unitss(),
+            'parameters' : data_curve.parameter_dict,
+            }
+        arrays = [data_curve.get_column_data(column_name) for column_name in data_curve.get_column_names()]
+
+        self._store_entry(file_path,configuration,meta,arrays)
+
+    def load_line_index(self,file_path,configuration):
+        """ Load the cached line index of a file 
+
+        Return the (starts, ends) byte offsets of the data lines or None if there is no valid entry
+        """
+
+        entry = self._load_entry(file_path,dict(configuration,line_index = True))
+        if entry is None:
+            return None
+
+        return tuple(entry[1])
+
+    def store_line_index(self,file_path,configuration,starts,ends):
+        """ Store the (starts, ends) byte offsets of the data lines of a file """
+
+        self._store_entry(file_path,dict(configuration,line_index = True),dict(),[starts,ends])
+
+    def _load_entry(self,file_path,configuration):
+        """ Return the meta dict and the memory mapped arrays of an entry, None if there is no valid entry """
+
+        entry_path = self._entry_path(file_path,configuration)
+        meta_path = os.path.join(entry_path,'meta.json')
+        try:
+            with open(meta_path,'r') as f_id:
+                meta = json.load(f_id)
+        except (OSError,ValueError):
+            return None
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # the source file was removed
+            self.invalidate(file_path)
+            return None
+        if meta['source_size'] != stat.st_size or meta['source_mtime'] != stat.st_mtime_ns:
+            shutil.rmtree(entry_path,ignore_errors = True)
+            return None
+
+        try:
+            arrays = list()
+            for i in range(meta['number_of_arrays']):
+                arrays.append(np.load(os.path.join(entry_path,'array_{0:d}.npy'.format(i)),mmap_mode = 'c'))
+            os.utime(meta_path) # least recently used order for the eviction
+        except (OSError,ValueError):
+            # the entry was evicted by another process
+            return None
+
+        return meta, arrays
+
+    def _store_entry(self,file_path,configuration,meta,arrays):
+        """ Write an entry, nothing is stored if it fails (ex : the same entry stored at the same time by another process) """
+
+        temporary_path = None
+        try:
+            stat = os.stat(file_path)
+            meta = dict(meta,
+                source_path = os.path.abspath(file_path),
+                source_size = stat.st_size,
+                source_mtime = stat.st_mtime_ns,
+                number_of_arrays = len(arrays),
+                )
+
+            temporary_path = tempfile.mkdtemp(prefix = TEMPORARY_PREFIX,dir = self.cache_dir)
+            for i, array in enumerate(arrays):
+                np.save(os.path.join(temporary_path,'array_{0:d}.npy'.format(i)),array)
+            with open(os.path.join(temporary_path,'meta.json'),'w') as f_id:
+                json.dump(meta,f_id,default = str)
+
+            entry_path = self._entry_path(file_path,configuration)
+            shutil.rmtree(entry_path,ignore_errors = True)
+            os.rename(temporary_path,entry_path)
+        except OSError:
+            if temporary_path is not None:
+                shutil.rmtree(temporary_path,ignore_errors = True)
+            return
+
+        self.evict()
+
+    def invalidate(self,file_path):
+        """ Remove all the entries of a file """
+
+        source_path = os.path.abspath(file_path)
+        for entry_path in list(self._entry_paths()):
+            try:
+                with open(os.path.join(entry_path,'meta.json'),'r') as f_id:
+                    entry_source_path = json.load(f_id)['source_path']
+            except (OSError,ValueError):
+                # removed by another process
+                continue
+            if entry_source_path == source_path:
+                shutil.rmtree(entry_path,ignore_errors = True)
+
+    def clear(self):
+        """ Remove all the entries """
+
+        for entry_path in list(self._entry_paths()):
+            shutil.rmtree(entry_path,ignore_errors = True)
+
+    def _entry_size(self,entry_path):
+
+        entry_size = 0
+        try:
+            for entry in os.scandir(entry_path):
+                entry_size += entry.stat().st_size
+        except FileNotFoundError:
+            # removed by another process
+            pass
+
+        return entry_size
+
+    def size(self):
+        """ Size of the cache in bytes """
+
+        return sum(self._entry_size(entry_path) for entry_path in self._entry_paths())
+
+    def evict(self):
+        """ Remove the least recently used entries until the cache is smaller than max_size """
+
+        entries = list()
+        for entry_path in self._entry_paths():
+            try:
+                last_use = os.stat(os.path.join(entry_path,'meta.json')).st_mtime
+            except FileNotFoundError:
+                # removed by another process
+                continue
+            entries.append((last_use,entry_path,self._entry_size(entry_path)))
+
+        entries.sort()
+        total_size = sum(entry[2] for entry in entries)
+        for last_use, entry_path, entry_size in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_path,ignore_errors = True)
+            total_size -= entry_size
@@ -0,0 +1,93 @@
+import bz2
+import gzip
+import lzma
+import os
+import zlib
+
+# Compressions known by their file extension or their first bytes
+EXTENSIONS = {'.gz' : 'gzip','.bz2' : 'bz2','.xz' : 'xz','.lzma' : 'xz'}
+MAGIC_BYTES = [(b'\x1f\x8b','gzip'),(b'BZh','bz2'),(b'\xfd7zXZ\x00','xz')]
+OPENERS = {'gzip' : gzip.open,'bz2' : bz2.open,'xz' : lzma.open}
+DECOMPRESSORS = {'gzip' : lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),'bz2' : bz2.BZ2Decompressor,'xz' : lzma.LZMADecompressor}
+
+def compression_of(file_path,check_content = True):
+    """ Compression of a file, None for a plain file
+
+    file_path : full path to the file
+    check_content : look at the first bytes of an existing file when the extension is not known
+    """
+
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+
+    if check_content and os.path.isfile(file_path):
+        with open(file_path,'rb') as f_id:
+            head = f_id.read(6)
+        for magic_bytes, compression in MAGIC_BYTES:
+            if head.startswith(magic_bytes):
+                return compression
+
+    return None
+
+def open_file(file_path,mode,compression,encoding = None):
+    """ Open a compressed file as a stream of the decompressed bytes or text
+
+    file_path : full path to the file
+    mode : mode of open ('rb', 'rt', 'wt', ...)
+    compression : 'gzip', 'bz2' or 'xz'
+    encoding : codec of a text mode
+    """
+
+    return OPENERS[compression](file_path,mode,encoding = encoding)
+
+class Decompressor(object):
+    """ Incremental decompression of a compressed file being written
+
+    The state of the decompression is kept between the calls to read, which only decompresses the
+    bytes appended to the file since the last call. Concatenated streams (ex : gzip members appended
+    to the file) are decompressed one after the other.
+    """
+
+    def __init__(self,file_path,compression):
+        """ Initialize a Decompressor at the start of the file
+
+        file_path : full path to the file
+        compression : 'gzip', 'bz2' or 'xz'
+        """
+
+        self.file_path = file_path
+        self.compression = compression
+        self.position = 0 # compressed bytes read
+
+        self._decompressor = DECOMPRESSORS[compression]()
+
+    def read(self,size = -1):
+        """ Decompressed bytes of the next compressed bytes of the file
+
+        size : maximal number of compressed bytes to read (default all the bytes up to the end of the file)
+
+        Return b'' at the end of the file
+        """
+
+        with open(self.file_path,'rb') as f_id:
+            f_id.seek(self.position)
+            while True:
+                data = f_id.read(size)
+                self.position += len(data)
+                decompressed = self._decompress(data)
+                if decompressed or not data:
+                    return decompressed
+
+    def _decompress(self,data):
+
+        decompressed = list()
+        while data:
+            decompressed.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            # end of a stream, the remaining bytes start the next one
+            data = self._decompressor.unused_data
+            self._decompressor = DECOMPRESSORS[self.compression]()
+
+        return b''.join(decompressed)
@@ -1,12 +1,220 @@
+import weakref
+
 import numpy as np
 
-from scipy.interpolate import interp1d
+def _selection_index(mask):
+    """ Slice (when possible) or integer array selecting the same elements as a boolean mask, a slice or an index array """
+
+    if isinstance(mask,slice):
+        return mask
+
+    mask = np.asarray(mask)
+    if not mask.dtype == bool:
+        return mask
+
+    return _rows_index(np.flatnonzero(mask))
+
+def _rows_index(rows):
+    """ Slice (when the rows are contiguous) or integer array selecting sorted unique rows """
+
+    if not len(rows):
+        return slice(0,0)
+    if rows[-1] - rows[0] + 1 == len(rows):
+        return slice(int(rows[0]),int(rows[-1]) + 1)
+
+    return rows
+
+def _compose_index(index,sub_index,length):
+    """ Index equivalent to selecting sub_index after index in an array of the given length """
+
+    if isinstance(index,slice):
+        if isinstance(sub_index,slice):
+            selected = range(*index.indices(length))[sub_index]
+            return slice(selected.start,selected.stop if selected.stop >= 0 else None,selected.step)
+        return np.arange(*index.indices(length))[sub_index]
+
+    return index[sub_index]
+
+def _index_length(index,length):
+
+    if isinstance(index,slice):
+        return len(range(*index.indices(length)))
+
+    return len(index)
+
+def _dtype_positions(dtypes):
+    """ Positions of the columns of each dtype, in the order of the first column of each dtype """
+
+    dtype_positions = dict()
+    for i, dtype in enumerate(dtypes):
+        dtype_positions.setdefault(np.dtype(dtype),list()).append(i)
+
+    return dtype_positions
+
+def _scatter_columns(values,buffer,positions):
+    """ values[:,positions] = buffer, copied by slices of consecutive positions (much faster than a fancy assignment) """
+
+    i = 0
+    for run in np.split(np.asarray(positions),np.flatnonzero(np.diff(positions) != 1) + 1):
+        values[:,run[0]:run[-1] + 1] = buffer[:,i:i + len(run)]
+        i += len(run)
+
+def _take(buffer,rows,columns):
+    """ Copy of the rows (slice or integer array) of the columns of a 2D buffer """
+
+    if columns == list(range(buffer.shape[1])):
+        values = buffer[rows]
+        return values.copy() if isinstance(rows,slice) else values
+    elif isinstance(rows,slice):
+        return buffer[rows][:,columns]
+
+    return buffer[np.ix_(rows,columns)]
+
+def _first_rows(sorted_x,starts,stops,condition):
+    """ First row of each range [starts, stops) of sorted_x where condition is True (stops if there is none),
+    found by bisection. The condition must be False and then True on each range.
+
+    condition : function returning the condition for an array with one value per range
+    """
+
+    starts = starts.copy()
+    stops = stops.copy()
+    while True:
+        searching = starts < stops
+        if not searching.any():
+            return starts
+        middles = (starts + stops)//2
+        found = condition(sorted_x[np.minimum(middles,len(sorted_x) - 1)])
+        stops = np.where(searching & found,middles,stops)
+        starts = np.where(searching & ~found,middles + 1,starts)
+
+def _window_bounds(sorted_x,lower,upper,in_window):
+    """ Bounds [starts, ends) of the windows of the sorted array sorted_x where in_window is True
+
+    lower, upper : limits of the windows, in_window(x) is lower < x < upper up to rounding errors
+    in_window : function returning the exact condition for an array with one value per window.
+        The condition must hold on an interval of values.
+    """
+
+    if issubclass(sorted_x.dtype.type,np.inexact):
+        # the nan, sorted last, are never in a window
+        sorted_x = sorted_x[:np.searchsorted(sorted_x,np.nan,'left')]
+
+    lower = np.atleast_1d(lower)
+    upper = np.atleast_1d(upper)
+    if not len(sorted_x):
+        return np.zeros(lower.shape,dtype = int), np.zeros(upper.shape,dtype = int)
+
+    # only the rows within a few float spacings of the limits can differ from the exact condition, 
+    # the bounds are searched among them by bisection (whatever the number of equal values)
+    margin = np.maximum(np.minimum(16*(np.spacing(np.abs(lower)) + np.spacing(np.abs(upper))),(upper - lower)/4),0)
+    starts = _first_rows(sorted_x,np.searchsorted(sorted_x,lower - margin,'left'),np.searchsorted(sorted_x,lower + margin,'right'),in_window)
+    ends = _first_rows(sorted_x,np.searchsorted(sorted_x,upper - margin,'left'),np.searchsorted(sorted_x,upper + margin,'right'),lambda x: ~in_window(x))
+
+    return starts, np.maximum(ends,starts)
+
+def _segment_statistic(values,segment_starts,counts,statistic):
+    """ Statistic of each segment of consecutive rows of values 
+
+    values : 2D array, the segments are along the first axis
+    segment_starts : first row of each segment
+    counts : number of rows of each segment (not zero)
+    statistic : 'mean', 'std', 'count', 'min', 'max' or 'median'
+    """
+
+    if statistic == 'count':
+        return np.repeat(counts[:,np.newaxis],values.shape[1],axis = 1)
+    elif statistic == 'mean':
+        return np.add.reduceat(values,segment_starts,axis = 0)/counts[:,np.newaxis]
+    elif statistic == 'std':
+        means = np.add.reduceat(values,segment_starts,axis = 0)/counts[:,np.newaxis]
+        deviations = values - np.repeat(means,counts,axis = 0)
+        return np.sqrt(np.add.reduceat(deviations**2,segment_starts,axis = 0)/counts[:,np.newaxis])
+    elif statistic == 'min':
+        return np.minimum.reduceat(values,segment_starts,axis = 0)
+    elif statistic == 'max':
+        return np.maximum.reduceat(values,segment_starts,axis = 0)
+    elif statistic == 'median':
+        segment_ids = np.broadcast_to(np.repeat(np.arange(len(counts)),counts),values.T.shape)
+        sorted_values = np.take_along_axis(values.T,np.lexsort((values.T,segment_ids),axis = -1),axis = -1).T
+        return (sorted_values[segment_starts + (counts - 1)//2] + sorted_values[segment_starts + counts//2])/2
+    else:
+        raise ValueError('Unknown statistic : {0:s}'.format(str(statistic)))
+
+# Executor running the per-column work of the DataCurves without their own executor
+_default_executor = None
+
+def set_default_executor(executor):
+    """ Executor (ex : concurrent.futures.ThreadPoolExecutor) running the per-column work of the DataCurves
+    without their own executor (see DataCurve.set_executor). None to run it in the calling thread.
+    """
+
+    global _default_executor
+    _default_executor = executor
+
+# Number of linear locators cached by a column
+LOCATORS_IN_CACHE = 8
+
+# Number of rows in each task that a packed DataCurve runs on its executor
+ROWS_PER_TASK = 2**16
+
+# Size in bytes below which a packed DataCurve does its work serially (the threads cost more than they save)
+PARALLEL_MIN_BYTES = 2**24
+
+def _statistic_column_dict(values,segment_starts,counts,statistics,column_names,column_unitss,map_columns = None):
+    """ Columns with the statistics of each segment of consecutive rows of values. Empty segments give nan.
+
+    The first statistic keeps the column names, the others are added as '{column name} {statistic}' columns
+    (a single 'count' column for 'count')
+    map_columns : if given, map_columns(function,column indexes) computes the statistics column by column
+    """
+
+    def segment_statistic(values,segment_starts,counts,statistic):
+
+        if map_columns is None:
+            return _segment_statistic(values,segment_starts,counts,statistic)
+
+        return np.column_stack(map_columns(lambda i: _segment_statistic(values[:,i:i + 1],segment_starts,counts,statistic),range(values.shape[1])))
+
+    nonempty = counts > 0
+    column_dict = dict()
+    for i_statistic, statistic in enumerate(statistics):
+        if statistic == 'count':
+            statistic_values = np.repeat(counts[:,np.newaxis],values.shape[1],axis = 1)
+        elif nonempty.all():
+            statistic_values = segment_statistic(values,segment_starts,counts,statistic)
+        else:
+            statistic_values = np.full((len(counts),values.shape[1]),np.nan)
+            statistic_values[nonempty] = segment_statistic(values,segment_starts[nonempty],counts[nonempty],statistic)
+
+        if i_statistic == 0:
+            for i, (column_name, column_units) in enumerate(zip(column_names,column_unitss)):
+                column_dict[column_name] = Column(column_name,column_units,statistic_values[:,i])
+        elif statistic == 'count':
+            column_dict['count'] = Column('count','',counts)
+        else:
+            for i, (column_name, column_units) in enumerate(zip(column_names,column_unitss)):
+                new_column_name = '{0:s} {1:s}'.format(column_name,statistic)
+                column_dict[new_column_name] = Column(new_column_name,column_units,statistic_values[:,i])
+
+    return column_dict
 
 class Column(object):
 
-    def __init__(self,name,units,data = list()):
+    block = None
+    indexed = False
+    _cache = None
+    _version = 0
+    _views = None
+
+    def __init__(self,name,units,data = list(),dtype = None):
+        """ Initialize a Column
+
+        dtype : numpy dtype of the data (default inferred from data)
+        """
 
         self.name = name
+        self.dtype = dtype
         self.set_units(units)
         self.set_data(data)
 
@@ -24,13 +232,25 @@ class Column(object):
 
         return f'{self.name} ({self.units}) : {self.data_length} points'
 
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        state.pop('_views',None)
+
+        return state
+
     def set_units(self,units):
 
         self.units = units
 
-    def set_data(self,data):
+    def set_data(self,data,copy = True):
 
-        self.data = np.array(data)
+        self.block = None
+        self.invalidate()
+        if copy:
+            self.data = np.array(data,dtype = self.dtype)
+        else:
+            self.data = np.asarray(data,dtype = self.dtype)
 
     def get_data(self):
 
@@ -40,6 +260,10 @@ class Column(object):
 
         return self.units
 
+    def get_dtype(self):
+
+        return self.data.dtype
+
     def rename(self,name):
 
         self.name = name
@@ -49,10 +273,18 @@ class Column(object):
         self.data[self.data_length] = value
         
         self.data_length += 1
+        self.invalidate()
+
+    def add_data_points(self,values):
+
+        self.data[self.data_length:self.data_length + len(values)] = values
+        self.invalidate()
+
+        self.data_length += len(values)
 
     def filter(self,mask):
 
-        self.set_data(self.data[mask])
+        self.set_data(self.get_data()[mask])
         self.update_length()
 
     def update_length(self):
@@ -62,8 +294,9 @@ class Column(object):
 
     def _extend_chunk(self,chunk_size):
 
-        larger_data = np.zeros((self.data_length + chunk_size,))
-        larger_data[:self.data_length] = self.data
+        self.block = None
+        larger_data = np.zeros((self.data_length + chunk_size,),dtype = self.data.dtype)
+        larger_data[:self.data_length] = self.data[:self.data_length]
         self.data = larger_data
         self.extend_data_length = self.data_length + chunk_size
 
@@ -74,7 +307,70 @@ class Column(object):
 
     def _copy(self):
 
-        return self.__class__(self.name,self.units,self.get_data())
+        return Column(self.name,self.units,self.get_data(),self.dtype)
+
+    def _add_view(self,view):
+        """ Keep track of a ColumnView selecting data of this column """
+
+        if self._views is None:
+            self._views = weakref.WeakSet()
+        self._views.add(view)
+
+    def _detach_views(self):
+        """ Copy the selected data into the ColumnViews of this column, before its data is handed out for writing """
+
+        if self._views:
+            for view in list(self._views):
+                view._detach()
+        self._views = None
+
+    def invalidate(self):
+        """ Count a modification of the data, the sorted index and the locators are computed again.
+        The Column and DataCurve methods call it, in-place edits of the arrays returned by get_data
+        or DataCurve.get_values_array must be followed by a call to invalidate.
+        """
+
+        self._version += 1
+
+    def _get_cache(self):
+        """ Dict of values derived from the data, cleared when the version of the data changes """
+
+        if self._cache is None or self._cache['version'] != self._version:
+            self._cache = {'version' : self._version}
+
+        return self._cache
+
+    def sorted_index(self):
+        """ Stable sort order of the data and the sorted data (cached) """
+
+        cache = self._get_cache()
+        if 'sorted_index' not in cache:
+            data = self.get_data()
+            order = np.argsort(data,kind = 'mergesort')
+            cache['sorted_index'] = order, data[order]
+
+        return cache['sorted_index']
+
+    def linear_locator(self,x_values):
+        """ LinearLocator of x_values in the data (cached for the last LOCATORS_IN_CACHE x_values) """
+
+        x_values = np.asarray(x_values)
+        locators = self._get_cache().setdefault('linear_locators',dict())
+        key = (x_values.dtype.str,x_values.shape,x_values.tobytes())
+        if key not in locators:
+            if len(locators) >= LOCATORS_IN_CACHE:
+                locators.pop(next(iter(locators)))
+            locators[key] = LinearLocator(*self.sorted_index(),x_values)
+
+        return locators[key]
+
+    def _without_data(self):
+        """ Shallow copy of the column without its data """
+
+        column = object.__new__(type(self))
+        column.__dict__.update(self.__dict__,data = None,block = None,_views = None)
+
+        return column
 
     def equals_within_tolerance(self,value,tolerance):
 
@@ -85,8 +381,282 @@ class Column(object):
         data = self.get_data()
         return np.logical_and(data > limits[0], data < limits[1])
 
+    def value_rows(self,value,tolerance):
+        """ Rows where the data is within tolerance of value, found in the sorted index 
+
+        Return a slice when the rows are contiguous, else a sorted array of rows
+        """
+
+        order, sorted_data = self.sorted_index()
+        starts, ends = _window_bounds(sorted_data,value - tolerance,value + tolerance,lambda x: np.abs(x - value) < tolerance)
+
+        return _rows_index(np.sort(order[starts[0]:ends[0]]))
+
+    def range_rows(self,limits):
+        """ Rows where the data is in the open interval limits, found in the sorted index 
+
+        Return a slice when the rows are contiguous, else a sorted array of rows
+        """
+
+        order, sorted_data = self.sorted_index()
+        start = np.searchsorted(sorted_data,limits[0],'right')
+        end = max(np.searchsorted(sorted_data,limits[1],'left'),start)
+
+        return _rows_index(np.sort(order[start:end]))
+
+class LazyColumn(Column):
+    """ Column whose data is only loaded the first time it is accessed """
+
+    def __init__(self,name,units,loader,data_length,dtype = None,loader_dtype = np.float64):
+        """ Initialize a LazyColumn
+
+        loader : function without argument returning the column data
+        data_length : number of data points that the loader will return
+        dtype : numpy dtype of the data (default inferred from the loaded data)
+        loader_dtype : dtype of the data that the loader is expected to return, 
+            given by get_dtype before the data is loaded when dtype is None
+        """
+
+        self.name = name
+        self.dtype = dtype
+        self.loader_dtype = loader_dtype
+        self.set_units(units)
+
+        self._loader = loader
+        self._data = None
+        self.data_length = data_length
+        self.extend_data_length = data_length
+
+    def __len__(self):
+
+        if self._data is None:
+            return self.data_length
+
+        return len(self._data)
+
+    def __getstate__(self):
+
+        state = Column.__getstate__(self)
+        state['_data'] = self.data
+        state['_loader'] = None
+
+        return state
+
+    @property
+    def data(self):
+
+        if self._data is None:
+            self._data = np.asarray(self._loader(),dtype = self.dtype)
+            self._loader = None
+
+        return self._data
+
+    @data.setter
+    def data(self,data):
+
+        self._data = data
+        self._loader = None
+
+    def get_dtype(self):
+        """ dtype of the data, without loading it """
+
+        if self._data is not None:
+            return self._data.dtype
+        if self.dtype is not None:
+            return np.dtype(self.dtype)
+
+        return np.dtype(self.loader_dtype)
+
+    def is_loaded(self):
+
+        return self._data is not None
+
+class ColumnView(Column):
+    """ Column whose data is a selection of the data of another column. The selected data is not copied 
+    until the column is modified (copy-on-write) and is read-only before that.
+
+    The data is shared with the selected column : in-place edits of the array returned by get_data of the
+    selected column are seen by the view. DataCurve.get_values_array copies the data of the views
+    before handing out the buffer of the columns.
+    """
+
+    def __init__(self,column,index):
+        """ Initialize a ColumnView
+
+        column : Column to select from
+        index : slice or integer array of the selected data points
+        """
+
+        self.name = column.name
+        self.dtype = column.dtype
+        self.set_units(column.units)
+
+        if isinstance(column,ColumnView) and column.is_view():
+            self._base = column._base
+            self._index = _compose_index(column._index,index,len(column._base))
+            self._source = column._source
+        else:
+            self._base = column.get_data()
+            self._index = index
+            self._source = column
+        self._data = None
+        self._source._add_view(self)
+
+        self.data_length = _index_length(self._index,len(self._base))
+        self.extend_data_length = self.data_length
+
+    def __len__(self):
+
+        if self.is_view():
+            return self.data_length
+
+        return len(self._data)
+
+    def __getstate__(self):
+
+        state = Column.__getstate__(self)
+        state.update(_data = np.array(self.data),_base = None,_index = None,_source = None)
+
+        return state
+
+    @property
+    def data(self):
+
+        if self._data is not None:
+            return self._data
+
+        data = self._base[self._index]
+        data.flags.writeable = False
+
+        return data
+
+    @data.setter
+    def data(self,data):
+
+        self._data = data
+        self._base = None
+        self._index = None
+        self._source = None
+
+    def get_dtype(self):
+
+        if self.is_view():
+            return self._base.dtype
+
+        return self._data.dtype
+
+    def filter(self,mask):
+
+        if not self.is_view():
+            return Column.filter(self,mask)
+
+        self._index = _compose_index(self._index,_selection_index(mask),len(self._base))
+        self.invalidate()
+        self.data_length = _index_length(self._index,len(self._base))
+        self.extend_data_length = self.data_length
+
+    def _crop(self):
+
+        if not self.is_view():
+            Column._crop(self)
+
+    def is_view(self):
+        """ True until the data of the column is copied """
+
+        return self._data is None
+
+    def _detach(self):
+        """ Copy the selected data, the view no longer depends on the selected column """
+
+        if self.is_view():
+            self.data = self._base[self._index].copy()
+
+class LinearLocator(object):
+    """ Position of target values between the values of an x array. It is shared by the linear 
+    interpolations of all the y arrays defined on the x array and gives the same values as
+    scipy.interpolate.interp1d(x,y,fill_value = 'extrapolate').
+    """
+
+    def __init__(self,order,sorted_x,x_values):
+        """ Initialize a LinearLocator
+
+        order : stable sort order of the x array
+        sorted_x : sorted x array
+        x_values : values where to interpolate
+        """
+
+        if len(sorted_x) < 2:
+            raise ValueError('x and y arrays must have at least 2 entries')
+
+        self.shape = np.shape(x_values)
+        self.data_length = len(sorted_x)
+
+        x_values = np.ravel(x_values)
+        indices = np.searchsorted(sorted_x,x_values).clip(1,len(sorted_x) - 1)
+        self.lo = order[indices - 1]
+        self.hi = order[indices]
+        x_lo = sorted_x[indices - 1]
+        self.dx = sorted_x[indices] - x_lo
+        self.offsets = x_values - x_lo
+
+    def interpolate(self,y_data,rows = None):
+        """ Interpolate y_data at the x_values 
+
+        y_data : y values along the first axis (a 2D array interpolates many columns at once)
+        rows : slice of the flattened x_values where to interpolate (default all x_values, keeping their shape)
+        """
+
+        y_data = np.asarray(y_data)
+        if not len(y_data) == self.data_length:
+            raise ValueError('x and y arrays must be equal in length along interpolation axis.')
+
+        lo, hi, dx, offsets = (self.lo, self.hi, self.dx, self.offsets) if rows is None else (self.lo[rows], self.hi[rows], self.dx[rows], self.offsets[rows])
+        y_lo = y_data[lo]
+        y_hi = y_data[hi]
+        if not issubclass(y_data.dtype.type,np.inexact):
+            y_lo = y_lo.astype(np.float64)
+            y_hi = y_hi.astype(np.float64)
+
+        shape = (-1,) + (1,) * (y_data.ndim - 1)
+        y_values = (y_hi - y_lo)/dx.reshape(shape)*offsets.reshape(shape) + y_lo
+
+        if rows is None:
+            return y_values.reshape(self.shape + y_data.shape[1:])
+
+        return y_values
+
+class ColumnBlock(object):
+    """ Contiguous (capacity, number of columns) buffer holding the data of columns sharing a dtype.
+    The data of each column is a strided view of one column of the buffer. A DataCurve holds one 
+    ColumnBlock per dtype of its columns. """
+
+    def __init__(self,columns,buffer,positions = None):
+        """ Initialize a ColumnBlock and bind the columns to the buffer
+
+        columns : list of Columns in the order of the buffer columns
+        buffer : 2D array
+        positions : positions of the columns in their DataCurve (default 0, 1, ...)
+        """
+
+        self.columns = list(columns)
+        self.buffer = buffer
+        self.positions = list(range(len(self.columns))) if positions is None else list(positions)
+        self.bind()
+
+    def bind(self):
+        """ Set the data of each column to its view of the buffer """
+
+        for i, column in enumerate(self.columns):
+            column.data = self.buffer[:,i]
+            column.extend_data_length = len(self.buffer)
+            column.block = self
+            column.invalidate()
+
 class DataCurve(object):
 
+    _blocks = ()
+    executor = None
+
     def __init__(self,*vargs,**kwargs):
 
         self.chunk_size = 100
@@ -106,12 +676,18 @@ class DataCurve(object):
                 self.extend_data_length = self.extend_data_length
 
         if 'column_names' in kwargs and 'column_units_labels' in kwargs:
-            self.init_columns(kwargs['column_names'],kwargs['column_units_labels'])
+            self.init_columns(kwargs['column_names'],kwargs['column_units_labels'],kwargs.get('column_dtypes'))
         elif 'column_dict' in kwargs:
             self.set_column_dict(kwargs['column_dict'])
 
+        if 'parameter_dict' in kwargs:
+            self.set_parameter_dict(kwargs['parameter_dict'])
+
     def __getattr__(self,name):
 
+        if name.startswith('__') or 'column_dict' not in self.__dict__:
+            raise AttributeError(name)
+
         if name in self.column_dict:
             return self.column_dict[name].get_data()
         
@@ -119,6 +695,27 @@ class DataCurve(object):
         if var_name in self.column_dict:
             return self.column_dict[var_name].get_data()
 
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        state.pop('executor',None)
+        if self._is_packed():
+            # the data is pickled once, as the used part of the buffers
+            state['column_dict'] = {column_name : column._without_data() for column_name, column in self.column_dict.items()}
+            state['_blocks'] = ()
+            state['_values'] = [(block.positions,block.buffer[:self.data_length]) for block in self._blocks]
+
+        return state
+
+    def __setstate__(self,state):
+
+        state = state.copy()
+        values = state.pop('_values',None)
+        self.__dict__.update(state)
+        if values is not None:
+            columns = list(self.column_dict.values())
+            self._blocks = [ColumnBlock([columns[i] for i in positions],buffer,positions) for positions, buffer in values]
+
     def __str__(self):
 
         info_str = f'{self.name:s} ({self.data_length:d} data points)\n'
@@ -139,23 +736,96 @@ class DataCurve(object):
 
         return new_column_dict
 
+    def copy(self):
+        """ Copy of the DataCurve holding its own data """
+
+        data_curve = self.__class__(column_dict = self._copy_column_dict())
+        data_curve.set_parameter_dict(dict(self.parameter_dict))
+
+        return data_curve
+
+    def set_executor(self,executor):
+        """ Executor (ex : concurrent.futures.ThreadPoolExecutor) running the per-column work of filter, sort_by,
+        interpolate, symetrize and average_multiple_measurement. None to use the default executor (see set_default_executor).
+        The buffers of packed DataCurves are split in chunks of ROWS_PER_TASK rows, 
+        when the data handled is larger than PARALLEL_MIN_BYTES bytes.
+        """
+
+        self.executor = executor
+
+    def get_executor(self):
+
+        if self.executor is None:
+            return _default_executor
+
+        return self.executor
+
+    def _map_columns(self,function,items):
+        """ [function(item) for item in items], run on the executor when there is one """
+
+        items = list(items)
+        executor = self.get_executor()
+        if executor is None or len(items) < 2:
+            return [function(item) for item in items]
+
+        return list(executor.map(function,items))
+
+    def _row_chunks(self,number_of_rows,row_size):
+        """ Slices of ROWS_PER_TASK rows to run on the executor, None without executor or for few rows 
+
+        row_size : number of bytes handled per row
+        """
+
+        if self.get_executor() is None or number_of_rows <= ROWS_PER_TASK or number_of_rows*row_size < PARALLEL_MIN_BYTES:
+            return None
+
+        return [slice(i,i + ROWS_PER_TASK) for i in range(0,number_of_rows,ROWS_PER_TASK)]
+
+    def _take_rows(self,buffer,rows,columns = None):
+        """ Copy of the rows (slice or integer array) of the columns (default all) of a 2D buffer,
+        gathered by chunks of ROWS_PER_TASK rows on the executor (each row of the buffer is read once)
+        """
+
+        if columns is None:
+            columns = list(range(buffer.shape[1]))
+
+        number_of_rows = _index_length(rows,len(buffer))
+        chunks = self._row_chunks(number_of_rows,len(columns)*buffer.itemsize)
+        if chunks is None:
+            return _take(buffer,rows,columns)
+
+        values = np.empty((number_of_rows,len(columns)),dtype = buffer.dtype)
+        def take(chunk):
+            values[chunk] = _take(buffer,_compose_index(rows,chunk,len(buffer)),columns)
+        self._map_columns(take,chunks)
+
+        return values
+
+    def query(self):
+        """ Query on the DataCurve. The selections are only applied by Query.collect """
+
+        return Query(self)
+
     def convert(self,new_class):
 
         return new_class(self)
 
-    def init_columns(self,column_names,column_units_labels = []):
+    def init_columns(self,column_names,column_units_labels = [],column_dtypes = None):
+
+        if column_dtypes is None:
+            column_dtypes = [None] * len(column_names)
         
         if len(column_names) == len(column_units_labels):
             for i, (column_name,column_units_label) in enumerate(zip(column_names,column_units_labels)):
-                self.add_column(column_name,column_units_label)
+                self.add_column(column_name,column_units_label,dtype = column_dtypes[i])
         else:
             for i, column_name in enumerate(column_names):
-                self.add_column(column_name,'')
+                self.add_column(column_name,'',dtype = column_dtypes[i])
 
-    def add_column(self,column_name,column_units_label,column_data = None):
+    def add_column(self,column_name,column_units_label,column_data = None,dtype = None):
 
         if column_data is None:
-            column_data = np.empty([0,])
+            column_data = np.empty([0,],dtype = dtype)
 
         if self.data_length:
             if not len(column_data) == self.data_length:
@@ -163,7 +833,7 @@ class DataCurve(object):
         else:
             self.data_length = len(column_data)
 
-        self.column_dict[column_name] = Column(column_name,column_units_label,column_data)
+        self.column_dict[column_name] = Column(column_name,column_units_label,column_data,dtype)
 
     def add_parameter(self,parameter_name,parameter_value):
 
@@ -184,6 +854,40 @@ class DataCurve(object):
             self.column_dict[old_name].rename(new_name)
             self.column_dict[new_name] = self.column_dict.pop(old_name)
 
+    def set_values_array(self,values):
+        """ Replace the data of all the columns
+
+        values : (n, number of columns) array with the data in the same order as the columns
+
+        The array is used as the storage of the columns, without copy, when its dtype suits every column.
+        Else the columns are stored in one buffer per dtype.
+        """
+
+        values = np.asarray(values)
+        if not (values.ndim == 2 and values.shape[1] == self.column_number()):
+            raise ValueError('New Data dimension {0:s} is not conform to the number of data columns ({1:d}).'.format(str(values.shape),self.column_number()))
+
+        dtypes = [values.dtype if column.dtype is None else np.dtype(column.dtype) for column in self.column_dict.values()]
+        if all(dtype == values.dtype for dtype in dtypes):
+            self._set_blocks([(values,list(range(len(dtypes))))],len(values))
+        else:
+            self._set_blocks([(values[:,positions].astype(dtype,copy = False),positions) for dtype, positions in _dtype_positions(dtypes).items()],len(values))
+
+    def _set_blocks(self,buffers,data_length):
+        """ Store the columns in new ColumnBlocks
+
+        buffers : list of (2D array, positions of its columns in the DataCurve), one per dtype
+        data_length : number of data points in the buffers
+        """
+
+        columns = list(self.column_dict.values())
+        for column in columns:
+            column.data_length = data_length
+        self._blocks = [ColumnBlock([columns[i] for i in positions],buffer,positions) for buffer, positions in buffers]
+
+        self.data_length = data_length
+        self.extend_data_length = data_length
+
     def add_data_point(self,values):
 
         if not len(values) == self.column_number():
@@ -193,35 +897,164 @@ class DataCurve(object):
             self._extend_chunk()
 
         if isinstance(values,dict):
-            new_data = values
-            if not new_data.keys() == self.column_dict.keys():
-                ValueError('Column name should already be present in DataCurve')
-
-        elif isinstance(values,list) or isinstance(values,np.ndarray):
-            new_data = dict(zip(self.get_column_names(),values))
+            if not values.keys() == self.column_dict.keys():
+                raise ValueError('Column name should already be present in DataCurve')
+            values = [values[column_name] for column_name in self.column_dict]
 
-        for column_name in self.column_dict:
-            self.column_dict[column_name].add_data_point(new_data[column_name])
+        if self._is_packed():
+            if len(self._blocks) == 1:
+                self._blocks[0].buffer[self.data_length] = values
+            else:
+                for block in self._blocks:
+                    block.buffer[self.data_length] = [values[i] for i in block.positions]
+            for column in self.column_dict.values():
+                column.data_length += 1
+                column.invalidate()
+        else:
+            for column, value in zip(self.column_dict.values(),values):
+                column.add_data_point(value)
         
         self.data_length += 1
 
+    def add_data_points(self,values):
+        """ Add many data points at once 
+
+        values : (n, number of columns) array with the data in the same order as the columns
+            or dict of arrays of length n with the column names as keys
+        """
+
+        if isinstance(values,dict):
+            if not values.keys() == self.column_dict.keys():
+                raise ValueError('Column name should already be present in DataCurve')
+            columns_values = [np.asarray(values[column_name]) for column_name in self.column_dict]
+            data_lengths = set(len(column_values) for column_values in columns_values)
+            if not len(data_lengths) == 1:
+                raise Exception('Data length must be the same')
+            number_of_points = data_lengths.pop()
+        else:
+            values = np.asarray(values)
+            if not (values.ndim == 2 and values.shape[1] == self.column_number()):
+                raise ValueError('New Data dimension {0:s} is not conform to the number of data columns ({1:d}).'.format(str(values.shape),self.column_number()))
+            columns_values = values.T
+            number_of_points = len(values)
+
+        if self.data_length + number_of_points > self.extend_data_length:
+            self._extend_chunk(number_of_points)
+
+        if self._is_packed():
+            for block in self._blocks:
+                new_rows = block.buffer[self.data_length:self.data_length + number_of_points]
+                if isinstance(values,dict):
+                    for j, i in enumerate(block.positions):
+                        new_rows[:,j] = columns_values[i]
+                elif len(self._blocks) == 1:
+                    new_rows[:] = values
+                else:
+                    new_rows[:] = values[:,block.positions]
+            for column in self.column_dict.values():
+                column.data_length += number_of_points
+                column.invalidate()
+        else:
+            for column, column_values in zip(self.column_dict.values(),columns_values):
+                column.add_data_points(column_values)
+
+        self.data_length += number_of_points
+
     def column_number(self):
 
         return len(self.column_dict)
 
-    def _extend_chunk(self):
+    def _extend_chunk(self,chunk_size = None):
+        """ Make room for at least chunk_size new data points (default self.chunk_size).
+        The capacity at least doubles so that adding n points one by one costs O(n) copies.
+        """
+
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        chunk_size = max(chunk_size,self.extend_data_length)
 
-        for column_name in self.column_dict:
-            self.column_dict[column_name]._extend_chunk(self.chunk_size)
-        self.extend_data_length = self.data_length+self.chunk_size
+        self._pack(self.data_length + chunk_size)
+        self.extend_data_length = self.data_length+chunk_size
 
     def _crop(self):
 
-        for column_name in self.column_dict:
-            self.column_dict[column_name]._crop()
+        if self._is_packed():
+            for block in self._blocks:
+                if len(block.buffer) > self.data_length:
+                    block.buffer = block.buffer[:self.data_length]
+                    block.bind()
+        else:
+            for column_name in self.column_dict:
+                self.column_dict[column_name]._crop()
 
         self.extend_data_length = self.data_length+0
 
+    def _is_packed(self):
+        """ True if all the columns are stored in the ColumnBlocks of the DataCurve """
+
+        if not self._blocks:
+            return False
+
+        columns = list(self.column_dict.values())
+        if len(self._blocks) == 1:
+            block = self._blocks[0]
+            return block.columns == columns and all([column.block is block for column in columns])
+
+        if not sum([len(block.columns) for block in self._blocks]) == len(columns):
+            return False
+
+        return all([block.columns == [columns[i] for i in block.positions] and all([column.block is block for column in block.columns]) for block in self._blocks])
+
+    def _pack(self,capacity = None):
+        """ Store the columns in ColumnBlocks, one per dtype
+
+        capacity : number of rows of the new buffers (default : keep the current blocks if there are, else data_length)
+        """
+
+        if capacity is None:
+            if self._is_packed():
+                return
+            capacity = self.data_length
+
+        if self._is_packed():
+            for block in self._blocks:
+                buffer = np.zeros((capacity,len(block.columns)),dtype = block.buffer.dtype)
+                buffer[:self.data_length] = block.buffer[:self.data_length]
+                block.buffer = buffer
+                block.bind()
+            return
+
+        for column_name, column in self.column_dict.items():
+            if isinstance(column,LazyColumn):
+                self.column_dict[column_name] = column._copy()
+        columns = list(self.column_dict.values())
+
+        blocks = list()
+        for dtype, positions in _dtype_positions([column.get_dtype() for column in columns]).items():
+            buffer = np.zeros((capacity,len(positions)),dtype = dtype)
+            for j, i in enumerate(positions):
+                buffer[:self.data_length,j] = columns[i].get_data()
+            blocks.append(ColumnBlock([columns[i] for i in positions],buffer,positions))
+        self._blocks = blocks
+
+    def _gather_rows(self,rows,column_names = None):
+        """ Copy of the rows (slice or integer array) of the columns (default all) of a packed DataCurve
+
+        Return a list of (2D array, positions of its columns in column_names), one per dtype
+        """
+
+        if column_names is None:
+            column_names = self.get_column_names()
+
+        block_columns = dict()
+        for k, column_name in enumerate(column_names):
+            column = self.column_dict[column_name]
+            block, buffer_columns, positions = block_columns.setdefault(id(column.block),(column.block,list(),list()))
+            buffer_columns.append(block.columns.index(column))
+            positions.append(k)
+
+        return [(self._take_rows(block.buffer[:self.data_length],rows,buffer_columns),positions) for block, buffer_columns, positions in block_columns.values()]
+
 
     def _check_column_name(self):
 
@@ -265,6 +1098,10 @@ class DataCurve(object):
 
         return column_unitss
 
+    def get_column_dtypes(self):
+
+        return [column.get_dtype() for column in self.column_dict.values()]
+
     def get_column_data(self,column_name):
 
         return self.column_dict[column_name].get_data()
@@ -289,17 +1126,26 @@ class DataCurve(object):
 
     def filter(self,mask,new_curve = False):
 
-        if new_curve:
-            column_dict = self._copy_column_dict()
-        else:
-            column_dict = self.column_dict
+        """ Keep the data points selected by mask (boolean array or index array)
 
-        for column_name, column in column_dict.items():
-            column.filter(mask)
+        new_curve : if True, return a new DataCurve made of ColumnViews of this one instead of filtering in place
+        """
 
         if new_curve:
+            index = _selection_index(mask)
+            column_dict = {column_name : ColumnView(column,index) for column_name, column in self.column_dict.items()}
             return self.__class__(column_dict = column_dict,parameter_dict = self.parameter_dict)
 
+        if self._is_packed():
+            # one gather of the rows of each buffer, much faster than a gather of each strided column
+            rows = _selection_index(mask)
+            self._set_blocks([(self._take_rows(block.buffer[:self.data_length],rows),block.positions) for block in self._blocks],
+                _index_length(rows,self.data_length))
+            return
+
+        self._map_columns(lambda column: column.filter(mask),self.column_dict.values())
+        self.set_column_dict(self.column_dict)
+
     def filter_column(self,column_names):
 
         new_column_dict = dict()
@@ -315,18 +1161,49 @@ class DataCurve(object):
     def sort_by(self,column_name):
 
         sort_i = np.argsort(self.column_dict[column_name].get_data())
-        new_column_dict = dict()
-        for column_name, column in self.column_dict.items():
-            column.set_data(column.get_data()[sort_i])
+        if self._is_packed():
+            for block in self._blocks:
+                block.buffer = self._take_rows(block.buffer[:self.data_length],sort_i)
+                block.bind()
+            self.extend_data_length = self.data_length
+            return
+
+        self._map_columns(lambda column: column.set_data(column.get_data()[sort_i]),self.column_dict.values())
+
+    def set_index(self,column_name,indexed = True):
+        """ Use a sorted index of the column for select_value and select_range. 
+        The index is built at the first selection and rebuilt after the column is modified by the 
+        DataCurve methods. In-place edits of the arrays returned by get_column_data or get_values_array
+        must be followed by invalidate.
+        """
+
+        self.column_dict[column_name].indexed = indexed
+
+    def invalidate(self,column_names = None):
+        """ Rebuild the sorted indexes and the locators of the columns (default all) after in-place edits of their data """
+
+        if column_names is None:
+            column_names = self.get_column_names()
+
+        for column_name in column_names:
+            self.column_dict[column_name].invalidate()
 
     def select_value(self,column_name,value,tolerance,new_curve = False):
         
-        mask = self.column_dict[column_name].equals_within_tolerance(value,tolerance)
+        column = self.column_dict[column_name]
+        if column.indexed:
+            mask = column.value_rows(value,tolerance)
+        else:
+            mask = column.equals_within_tolerance(value,tolerance)
         return self.filter(mask,new_curve)
 
     def select_range(self,column_name,limits,new_curve = False):
 
-        mask = self.column_dict[column_name].in_range(limits)
+        column = self.column_dict[column_name]
+        if column.indexed:
+            mask = column.range_rows(limits)
+        else:
+            mask = column.in_range(limits)
         return self.filter(mask,new_curve)
 
     def select_direction(self,column_name,direction,new_curve = False):
@@ -334,30 +1211,79 @@ class DataCurve(object):
         mask = np.gradient(self.get_column_data(column_name))*direction > 0
         return self.filter(mask,new_curve)
 
-    def average_multiple_measurement(self,select_column_name,value_step):
+    def average_multiple_measurement(self,select_column_name,value_step,statistics = 'mean',new_curve = False):
+        """ Group the data points by value of a column and reduce each group to one data point.
+        There is a group for each multiple of value_step near a value of the column. It holds the data points 
+        closer than value_step/sqrt(2) to the multiple (a data point can belong to two groups).
+
+        select_column_name : name of the column used to group the data points
+        value_step : spacing of the group values
+        statistics : 'mean', 'std', 'count', 'min', 'max', 'median' or list of them. The first statistic
+            replaces the data of the columns, the others are added as '{column name} {statistic}' columns
+            (a single 'count' column for 'count')
+        new_curve : if True, return a new DataCurve instead of modifying this one
+        """
+
+        if isinstance(statistics,str):
+            statistics = [statistics]
 
-        unique_values = np.unique(np.round(self.get_column_data(select_column_name)/value_step))*value_step
-        
         select_column_data = self.get_column_data(select_column_name)
-        for column_name, column in self.column_dict.items():
-            new_data = np.zeros(unique_values.shape)
-            for i_value, value in enumerate(unique_values):
-                ind = (select_column_data - value)**2 < value_step**2/2
-                new_data[i_value] = np.average(column.get_data()[ind])
+        unique_values = np.unique(np.round(select_column_data/value_step))*value_step
+
+        order = np.argsort(select_column_data,kind = 'stable')
+        width_squared = value_step**2/2
+        starts, ends = _window_bounds(select_column_data[order],unique_values - np.sqrt(width_squared),unique_values + np.sqrt(width_squared),
+            lambda x: (x - unique_values)**2 < width_squared)
+        counts = ends - starts
+        segment_starts = np.concatenate(([0],np.cumsum(counts)[:-1]))
+        positions = np.arange(counts.sum()) - np.repeat(segment_starts - starts,counts)
+
+        # one gather of every column, the data points of the groups are consecutive
+        gather = order[positions]
+        if self._is_packed():
+            buffers = self._gather_rows(gather)
+            values = buffers[0][0]
+            if len(buffers) > 1:
+                values = np.empty((len(gather),self.column_number()),dtype = np.result_type(*[buffer.dtype for buffer, buffer_positions in buffers]))
+                for buffer, buffer_positions in buffers:
+                    _scatter_columns(values,buffer,buffer_positions)
+        else:
+            values = np.column_stack(self._map_columns(lambda column: column.get_data()[gather],self.column_dict.values()))
 
-            column.set_data(new_data)
-        self.data_length = len(unique_values)
-        self.extend_data_length = len(unique_values)
+        map_columns = None if self.get_executor() is None else self._map_columns
+        new_column_dict = _statistic_column_dict(values,segment_starts,counts,statistics,self.get_column_names(),self.get_column_unitss(),map_columns)
+
+        if new_curve:
+            return self.__class__(column_dict = new_column_dict,parameter_dict = self.parameter_dict)
+
+        self.set_column_dict(new_column_dict)
 
     def interpolate(self,x_column_name,x_values):
+        """ New DataCurve with all the columns linearly interpolated at x_values of the x column 
+        (extrapolated outside of the data range)
+        """
+
+        locator = self.column_dict[x_column_name].linear_locator(x_values)
+        if self._is_packed():
+            column_values = [None] * self.column_number()
+            for block in self._blocks:
+                buffer = block.buffer[:self.data_length]
+                chunks = self._row_chunks(len(locator.lo),buffer.shape[1]*np.dtype(np.float64).itemsize)
+                if chunks is None:
+                    values = locator.interpolate(buffer)
+                else:
+                    values = np.concatenate(self._map_columns(lambda chunk: locator.interpolate(buffer,chunk),chunks)).reshape(locator.shape + buffer.shape[1:])
+                for j, i in enumerate(block.positions):
+                    column_values[i] = values[...,j]
+        else:
+            column_values = self._map_columns(lambda column: locator.interpolate(column.get_data()),self.column_dict.values())
 
-        x_column_data = self.get_column_data(x_column_name)
         new_column_dict = dict()
-        for column_name, column in self.column_dict.items():
+        for i, (column_name, column) in enumerate(self.column_dict.items()):
             if column_name == x_column_name:
                 new_column = Column(column_name,column.units,x_values)
             else:
-                new_column = Column(column_name,column.units,self.y_at_x(x_column_name,column_name,x_values))
+                new_column = Column(column_name,column.units,column_values[i])
 
             new_column_dict[column_name] = new_column
 
@@ -365,30 +1291,31 @@ class DataCurve(object):
 
     def y_at_x(self,x_column_name,y_column_name,x_values):
 
-        f = interp1d(self.get_column_data(x_column_name),self.get_column_data(y_column_name),fill_value='extrapolate')
-
-        return f(x_values)
+        return self.column_dict[x_column_name].linear_locator(x_values).interpolate(self.get_column_data(y_column_name))
 
     def symetrize(self,x_column_name,sym_y_column_names = list(),antisym_y_column_names = list(),x_values = None,x_step = None):
 
         if x_values is None and not x_step is None:
             x_values = self.auto_sym_x_values(x_column_name,x_step)
         elif not x_values is None and x_step is None:
-            pass
+            x_values = np.asarray(x_values)
         else:
             raise(ValueError('Most provide x_values or x_step'))
 
-        sym_column_dict = dict()
-        for column_name, column in self.column_dict.items():
-            f = interp1d(self.get_column_data(x_column_name),column.data,fill_value='extrapolate')
-            if column_name in sym_y_column_names:
-                sym_data = (f(x_values) + f(-x_values))/2
-            elif column_name in antisym_y_column_names:
-                sym_data = (f(x_values) - f(-x_values))/2
+        locator = self.column_dict[x_column_name].linear_locator(x_values)
+        mirror_locator = self.column_dict[x_column_name].linear_locator(-x_values)
+
+        def symetrize_column(column):
+
+            if column.name in sym_y_column_names:
+                sym_data = (locator.interpolate(column.get_data()) + mirror_locator.interpolate(column.get_data()))/2
             else:
-                continue
+                sym_data = (locator.interpolate(column.get_data()) - mirror_locator.interpolate(column.get_data()))/2
 
-            sym_column_dict[column_name] = Column(column_name,column.units,sym_data)
+            return Column(column.name,column.units,sym_data)
+
+        columns = [column for column_name, column in self.column_dict.items() if column_name in sym_y_column_names or column_name in antisym_y_column_names]
+        sym_column_dict = {column.name : column for column in self._map_columns(symetrize_column,columns)}
         
         return self.set_column_dict(sym_column_dict)
 
@@ -399,38 +1326,427 @@ class DataCurve(object):
         return np.linspace(0,max_x_value,int(max_x_value/x_step)+1)
 
     def get_values_array(self):
+        """ (n, number of columns) array of the data. 
+        When the columns share a dtype, it is the buffer holding the columns (not a copy). The ColumnViews
+        selected from the columns copy their data first, so writing in the buffer does not change them.
+        """
+
+        for column in self.column_dict.values():
+            column._detach_views()
+
+        return self._values_array()
+
+    def _values_array(self):
+        """ get_values_array for reading only, the ColumnViews keep sharing the data """
 
         self._crop()
+        self._pack()
+        if len(self._blocks) == 1:
+            return self._blocks[0].buffer
+
         values_array = np.zeros((self.data_length,self.column_number()))
-        for i, column_name in enumerate(self.column_dict):
-            values_array[:,i] = self.column_dict[column_name].get_data()
+        for block in self._blocks:
+            _scatter_columns(values_array,block.buffer,block.positions)
 
         return values_array
 
     def append(self,other):
+        """ Add the data points of other at the end. To join many DataCurves, use DataCurve.concat. """
 
-        new_column_dict = dict()
-        for column_name, column in self.column_dict.items():
-            X1 = self.column_dict[column_name].get_data()
-            X2 = other.column_dict[column_name].get_data()
-            new_data = np.concatenate((X1,X2))
+        builder = DataCurveBuilder(check_columns = False)
+        builder.add(self)
+        builder.add(other)
+        new_data_curve = builder.build()
 
-            new_column_dict[column_name] = Column(column_name,column.units,new_data)
+        self.set_column_dict(new_data_curve.column_dict)
+        self._blocks = new_data_curve._blocks
 
-        self.set_column_dict(new_column_dict)
+    @classmethod
+    def concat(cls,data_curves,source_column_name = None):
+        """ Join DataCurves with the same column names and units (see DataCurveBuilder) 
+
+        source_column_name : name of an added column with the position of the source DataCurve of each data point
+
+        Return a new DataCurve of the class of the first DataCurve
+        """
+
+        builder = DataCurveBuilder(source_column_name)
+        for data_curve in data_curves:
+            builder.add(data_curve)
+
+        return builder.build()
+
+class DataCurveBuilder(object):
+    """ Join DataCurves end to end. The DataCurves are only copied by build, once, in storage of the final size. """
+
+    def __init__(self,source_column_name = None,check_columns = True):
+        """ Initialize a DataCurveBuilder
+
+        source_column_name : name of an added column with the position of the source DataCurve of each data point
+        check_columns : if True, the DataCurves must have the same column names and units, 
+            else only the columns of the first DataCurve are read in the others
+        """
+
+        self.source_column_name = source_column_name
+        self.check_columns = check_columns
+        self.data_curves = list()
+
+    def add(self,data_curve):
+        """ Add a DataCurve after the previous ones """
+
+        if self.data_curves and self.check_columns:
+            first_data_curve = self.data_curves[0]
+            if not data_curve.get_column_names() == first_data_curve.get_column_names():
+                raise ValueError('Column names of the DataCurves must be the same')
+            if not data_curve.get_column_unitss() == first_data_curve.get_column_unitss():
+                raise ValueError('Column units of the DataCurves must be the same')
+
+        self.data_curves.append(data_curve)
+
+        return self
+
+    def build(self):
+        """ Return the joined DataCurve, with the class and parameters of the first DataCurve """
+
+        if not self.data_curves:
+            raise ValueError('No DataCurve to join')
+
+        first_data_curve = self.data_curves[0]
+        column_names = first_data_curve.get_column_names()
+        data_lengths = [data_curve.data_length for data_curve in self.data_curves]
+        offsets = np.concatenate(([0],np.cumsum(data_lengths)))
+        dtypes = [np.result_type(*[data_curve.column_dict[column_name].get_dtype() for data_curve in self.data_curves]) for column_name in column_names]
+
+        data_curve = first_data_curve.__class__(column_names = column_names,column_units_labels = first_data_curve.get_column_unitss(),
+            parameter_dict = dict(first_data_curve.parameter_dict))
+        buffers = list()
+        for dtype, positions in _dtype_positions(dtypes).items():
+            buffer_column_names = [column_names[i] for i in positions]
+            values = np.empty((offsets[-1],len(positions)),dtype = dtype)
+            for i, source_data_curve in enumerate(self.data_curves):
+                source_rows = values[offsets[i]:offsets[i + 1]]
+                source_blocks = [block for block in source_data_curve._blocks if [column.name for column in block.columns] == buffer_column_names]
+                if source_blocks and source_data_curve._is_packed():
+                    source_rows[:] = source_blocks[0].buffer[:data_lengths[i]]
+                else:
+                    for j, column_name in enumerate(buffer_column_names):
+                        source_rows[:,j] = source_data_curve.get_column_data(column_name)
+            buffers.append((values,positions))
+        data_curve._set_blocks(buffers,offsets[-1])
+
+        if self.source_column_name is not None:
+            data_curve.add_column(self.source_column_name,'',np.repeat(np.arange(len(self.data_curves)),data_lengths))
+
+        return data_curve
+
+class Query(object):
+    """ Deferred selection of the data points of a DataCurve.
+    The selections that do not depend on the order of the data points are combined in a single mask. 
+    The direction selections and the sorts work on the rows selected so far. 
+    Only the columns used by the steps and the selected columns are read.
+    """
+
+    def __init__(self,data_curve):
+
+        self.data_curve = data_curve
+        self.steps = list()
+        self.column_names = None
+
+    def range(self,column_name,limits):
+        """ Keep the data points where the column is in the open interval limits """
+
+        self.steps.append(('range',column_name,limits))
+        return self
+
+    def value(self,column_name,value,tolerance):
+        """ Keep the data points where the column is within tolerance of value """
+
+        self.steps.append(('value',column_name,(value,tolerance)))
+        return self
+
+    def mask(self,mask):
+        """ Keep the data points selected by a boolean array over all the data points of the DataCurve """
+
+        self.steps.append(('mask',None,np.asarray(mask)))
+        return self
+
+    def direction(self,column_name,direction):
+        """ Keep the data points where the column increases (direction = 1) or decreases (direction = -1) """
+
+        self.steps.append(('direction',column_name,direction))
+        return self
+
+    def sort(self,column_name):
+        """ Sort the data points by the values of the column """
+
+        self.steps.append(('sort',column_name,None))
+        return self
+
+    def select(self,column_names):
+        """ Columns of the resulting DataCurve (default all the columns) """
+
+        self.column_names = list(column_names)
+        return self
+
+    def _row_condition(self,kind,column_name,argument,rows = None):
+        """ Boolean array of a selection that does not depend on the order of the data points """
+
+        if kind == 'mask':
+            return argument if rows is None else argument[rows]
+
+        data = self.data_curve.get_column_data(column_name)
+        if rows is not None:
+            data = data[rows]
+        if kind == 'range':
+            return np.logical_and(data > argument[0],data < argument[1])
+        else:
+            value, tolerance = argument
+            return np.abs(data - value) < tolerance
+
+    def _rows(self):
+        """ Index of the selected rows in their final order """
+
+        mask = None
+        rows = None
+        sorted_rows = True
+        for kind, column_name, argument in self.steps:
+            if kind in ('range','value','mask'):
+                if rows is None:
+                    condition = self._row_condition(kind,column_name,argument)
+                    mask = condition if mask is None else np.logical_and(mask,condition)
+                else:
+                    rows = rows[self._row_condition(kind,column_name,argument,rows)]
+                continue
+
+            if rows is None:
+                rows = np.arange(self.data_curve.data_length) if mask is None else np.flatnonzero(mask)
+            data = self.data_curve.get_column_data(column_name)[rows]
+            if kind == 'direction':
+                rows = rows[np.gradient(data)*argument > 0]
+            else:
+                rows = rows[np.argsort(data)]
+                sorted_rows = False
+
+        if rows is None:
+            return slice(None) if mask is None else _selection_index(mask)
+        elif sorted_rows:
+            return _rows_index(rows)
+
+        return rows
+
+    def collect(self,view = False):
+        """ Apply the query 
+
+        view : if True, the columns of the new DataCurve are ColumnViews of the DataCurve columns, 
+            else each selected column is gathered once
+
+        Return a new DataCurve
+        """
+
+        data_curve = self.data_curve
+        column_names = data_curve.get_column_names() if self.column_names is None else self.column_names
+        rows = self._rows()
+
+        if view:
+            column_dict = {column_name : ColumnView(data_curve.column_dict[column_name],rows) for column_name in column_names}
+            return data_curve.__class__(column_dict = column_dict,parameter_dict = data_curve.parameter_dict)
+
+        new_data_curve = data_curve.__class__(column_names = column_names,
+            column_units_labels = [data_curve.get_column_units(column_name) for column_name in column_names],
+            parameter_dict = data_curve.parameter_dict)
+        if data_curve._is_packed():
+            # only the selected rows of the selected columns are gathered
+            new_data_curve._set_blocks(data_curve._gather_rows(rows,column_names),_index_length(rows,data_curve.data_length))
+        else:
+            for column_name in column_names:
+                column = new_data_curve.column_dict[column_name]
+                column.set_data(data_curve.get_column_data(column_name)[rows])
+                column.update_length()
+            new_data_curve.set_column_dict(new_data_curve.column_dict)
+
+        return new_data_curve
+
+    def explain(self):
+        """ Description of the steps of the query """
+
+        lines = ['Query on {0:s} ({1:d} data points)'.format(self.data_curve.name,self.data_curve.data_length)]
+        fused = True
+        for i, (kind, column_name, argument) in enumerate(self.steps):
+            if kind in ('direction','sort'):
+                fused = False
+            if kind == 'mask':
+                description = 'mask'
+            elif kind == 'sort':
+                description = 'sort by {0:s}'.format(column_name)
+            else:
+                description = '{0:s} {1:s} {2:s}'.format(kind,column_name,str(argument))
+            where = 'combined mask' if fused and not kind == 'sort' else 'selected rows'
+            lines.append('  {0:d}. {1:s} : {2:s}'.format(i + 1,description,where))
+        column_names = self.data_curve.get_column_names() if self.column_names is None else self.column_names
+        lines.append('  gather : {0:s}'.format(', '.join(column_names)))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+
+        return self.explain()
 
 class DataCurveSequence(object):
+    """ Sequence of DataCurves. 
+
+    Once packed, the DataCurves share one concatenated Column per column name and the offsets of
+    their data points. The DataCurves are then ColumnViews of the packed columns and the reductions,
+    selections and sorts run on the packed columns for all the DataCurves at once.
+    """
+
+    def __init__(self,data_curves = None):
 
-    def __init__(self,data_curves = list()):
+        if data_curves is None:
+            data_curves = list()
 
         self.data_curves = data_curves
+        self.errors = dict()
+
+        self.column_dict = None
+        self.offsets = None
+        self._curve_infos = None
+
+    def __len__(self):
+
+        if self.is_packed():
+            return len(self.offsets) - 1
+
+        return len(self.data_curves)
+
+    def __iter__(self):
+
+        if self.is_packed():
+            return (self._packed_data_curve(i) for i in range(len(self)))
+
+        return iter(self.data_curves)
+
+    def __getitem__(self,index):
+
+        if not self.is_packed():
+            return self.data_curves[index]
+
+        if isinstance(index,slice):
+            return [self._packed_data_curve(i) for i in range(len(self))[index]]
+
+        return self._packed_data_curve(range(len(self))[index])
 
     def add_data_curve(self,data_curve):
 
+        if self.is_packed():
+            self.unpack()
+
         self.data_curves.append(data_curve)
 
+    def add_error(self,name,error):
 
+        self.errors[name] = error
 
+    def is_packed(self):
 
+        return self.offsets is not None
 
-        
+    def pack(self):
+        """ Concatenate the columns of the DataCurves. The DataCurves must have the same column names. """
+
+        if self.is_packed():
+            return
+
+        column_names = self.data_curves[0].get_column_names() if self.data_curves else list()
+        for data_curve in self.data_curves:
+            if not data_curve.get_column_names() == column_names:
+                raise ValueError('Column names of the DataCurves must be the same')
+
+        column_dict = dict()
+        for column_name in column_names:
+            column_data = np.concatenate([data_curve.get_column_data(column_name) for data_curve in self.data_curves])
+            column_dict[column_name] = Column(column_name,self.data_curves[0].get_column_units(column_name),column_data)
+
+        self.column_dict = column_dict
+        self.offsets = np.concatenate(([0],np.cumsum([data_curve.data_length for data_curve in self.data_curves]))).astype(np.int64)
+        self._curve_infos = [(data_curve.__class__,data_curve.name,data_curve.parameter_dict) for data_curve in self.data_curves]
+        self.data_curves = None
+
+    def unpack(self):
+        """ Go back to a list of independent DataCurves (ColumnViews of the packed columns) """
+
+        if self.is_packed():
+            self.data_curves = list(self)
+            self.column_dict = None
+            self.offsets = None
+            self._curve_infos = None
+
+    def _packed_data_curve(self,i):
+
+        data_curve_class, name, parameter_dict = self._curve_infos[i]
+        rows = slice(int(self.offsets[i]),int(self.offsets[i + 1]))
+        column_dict = {column_name : ColumnView(column,rows) for column_name, column in self.column_dict.items()}
+        data_curve = data_curve_class(column_dict = column_dict,parameter_dict = parameter_dict)
+        data_curve.name = name
+
+        return data_curve
+
+    def get_curve_lengths(self):
+
+        self.pack()
+
+        return np.diff(self.offsets)
+
+    def get_column_data(self,column_name):
+        """ Concatenated data of a column for all the DataCurves """
+
+        self.pack()
+
+        return self.column_dict[column_name].get_data()
+
+    def reduce(self,statistics = 'mean',column_names = None):
+        """ Statistics of each DataCurve
+
+        statistics : 'mean', 'std', 'count', 'min', 'max', 'median' or list of them (see DataCurve.average_multiple_measurement)
+        column_names : columns to reduce (default all the columns)
+
+        Return a DataCurve with one data point per DataCurve (nan for empty DataCurves)
+        """
+
+        self.pack()
+        if isinstance(statistics,str):
+            statistics = [statistics]
+        if column_names is None:
+            column_names = list(self.column_dict.keys())
+
+        values = np.column_stack([self.get_column_data(column_name) for column_name in column_names])
+        column_unitss = [self.column_dict[column_name].get_units() for column_name in column_names]
+
+        return DataCurve(column_dict = _statistic_column_dict(values,self.offsets[:-1],np.diff(self.offsets),statistics,column_names,column_unitss))
+
+    def filter(self,mask):
+        """ Keep the data points selected by a boolean array over the concatenated data points """
+
+        self.pack()
+        mask = np.asarray(mask,dtype = bool)
+        for column in self.column_dict.values():
+            column.filter(mask)
+        self.offsets = np.concatenate(([0],np.cumsum(mask)))[self.offsets]
+
+    def select_value(self,column_name,value,tolerance):
+
+        self.pack()
+        self.filter(self.column_dict[column_name].equals_within_tolerance(value,tolerance))
+
+    def select_range(self,column_name,limits):
+
+        self.pack()
+        self.filter(self.column_dict[column_name].in_range(limits))
+
+    def sort_by(self,column_name):
+        """ Sort the data points of each DataCurve by the values of a column """
+
+        self.pack()
+        curve_numbers = np.repeat(np.arange(len(self)),np.diff(self.offsets))
+        order = np.lexsort((self.get_column_data(column_name),curve_numbers))
+        for column in self.column_dict.values():
+            column.set_data(column.get_data()[order])
@@ -0,0 +1,141 @@
+import os
+from os import path
+import tempfile
+import time
+
+import numpy as np
+
+def make_md_data_file(file_path,number_of_rows = 200000,number_of_columns = 11):
+
+    from AsciiDataFile.Writers import MDDataFileWriter as Writer
+
+    writer = Writer(file_path,auto_numbering = False)
+    column_names = ['column{0:d}'.format(i) for i in range(number_of_columns)]
+    writer.write_header(column_names,['u.a.'] * number_of_columns)
+    writer._write_values(np.random.rand(number_of_rows,number_of_columns))
+    writer.close()
+
+def benchmark_reader_engines():
+
+    from AsciiDataFile.Readers import MDDataFileReader as Reader
+
+    file_path = path.join(tempfile.mkdtemp(),'benchmark.txt')
+    make_md_data_file(file_path)
+
+    reader = Reader()
+    for engine in ['line','block','mmap']:
+        t0 = time.time()
+        data_curve = reader.read(file_path,engine = engine)
+        data_curve.column0
+        data_curve.column5
+        print('{0:>6s} engine : {1:.3f} s ({2:d} rows)'.format(engine,time.time() - t0,data_curve.data_length))
+
+def make_large_example_file(file_path,data_file,number_of_rows = 150000):
+    """ Copy an example data file, repeating its data lines up to number_of_rows lines """
+
+    with open(path.join(path.dirname(__file__),'data',data_file),'rb') as f_id:
+        content = f_id.read()
+
+    data_start = content.find(b'[Data]')
+    if data_start >= 0: # Quantum Design files, the data part starts after the column heads
+        data_start = content.index(b'\n',content.index(b'\n',data_start) + 1) + 1
+    else:
+        data_start = content.index(b'\n',content.index(b'[Header end]')) + 1
+    data = content[data_start:].lstrip(b'\r\n')
+    if not data.endswith(b'\n'):
+        data += b'\n'
+
+    with open(file_path,'wb') as f_id:
+        f_id.write(content[:data_start] + data * max(1,number_of_rows//data.count(b'\n')))
+
+def benchmark_example_files():
+
+    from AsciiDataFile import Readers
+
+    cases = [
+        (Readers.PPMSResistivityDataReader,'20181108_RvsT_3CH_Side1.dat'),
+        (Readers.SQUIDDataReader,'20171003_NiFe_ech1_MvsH_500eO_001.dc.dat'),
+        (Readers.PPMSHeatCapacityDataReader,'Add-135-15Feb2019-1.dat'),
+        (Readers.MDDataFileReader,'20180711_44.0K.txt'),
+        ]
+
+    for reader_class, data_file in cases:
+        file_path = path.join(tempfile.mkdtemp(),data_file)
+        make_large_example_file(file_path,data_file)
+        times = list()
+        for engine in ['line','block']:
+            t0 = time.time()
+            data_curve = reader_class().read(file_path,engine = engine)
+            times.append(time.time() - t0)
+        print('{0:>42s} : {1:.3f} s line, {2:.3f} s block ({3:.1f}x, {4:d} rows)'.format(data_file,times[0],times[1],times[0]/times[1],data_curve.data_length))
+
+def make_wide_data_curve(number_of_rows = 1000000,number_of_columns = 21):
+
+    from AsciiDataFile.DataContainer import DataCurve
+
+    column_names = ['column{0:d}'.format(i) for i in range(number_of_columns)]
+    column_dtypes = [None] * (number_of_columns - 1) + ['int32'] # mixed dtypes, like the heat capacity files
+    data_curve = DataCurve(column_names = column_names,column_units_labels = ['u.a.'] * number_of_columns,column_dtypes = column_dtypes)
+    data_curve.add_data_points(np.random.rand(number_of_rows,number_of_columns)*100)
+
+    return data_curve
+
+def benchmark_column_executor(workers = 4):
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    data_curve = make_wide_data_curve()
+    x_values = np.linspace(0,100,100000)
+    operations = [
+        ('filter',lambda data_curve: data_curve.filter(data_curve.column1 > 10)),
+        ('sort_by',lambda data_curve: data_curve.sort_by('column2')),
+        ('interpolate',lambda data_curve: data_curve.interpolate('column0',x_values)),
+        ('average',lambda data_curve: data_curve.average_multiple_measurement('column0',0.01,new_curve = True)),
+        ]
+
+    cpu_count = len(os.sched_getaffinity(0)) if hasattr(os,'sched_getaffinity') else os.cpu_count()
+    print('{0:d} CPU available'.format(cpu_count))
+    if cpu_count < 2:
+        print('the threads share one CPU, no speedup is expected')
+    with ThreadPoolExecutor(workers) as executor:
+        for packed in [False,True]:
+            for name, operation in operations:
+                times = list()
+                for operation_executor in [None,executor]:
+                    data_curve_copy = data_curve.copy()
+                    if packed:
+                        data_curve_copy.get_values_array()
+                    data_curve_copy.set_executor(operation_executor)
+                    t0 = time.time()
+                    operation(data_curve_copy)
+                    times.append(time.time() - t0)
+                print('{0:>12s} ({1:s}) : {2:.3f} s serial, {3:.3f} s with {4:d} threads ({5:.1f}x)'.format(name,'packed' if packed else 'columns',times[0],times[1],workers,times[0]/times[1]))
+
+def benchmark_writer(number_of_rows = 200000,number_of_columns = 10):
+
+    from AsciiDataFile.Writers import DataColumnWriter as Writer
+
+    values = np.random.rand(number_of_rows,number_of_columns)
+    file_path = path.join(tempfile.mkdtemp(),'benchmark.txt')
+
+    writer = Writer(file_path,auto_numbering = False)
+    t0 = time.time()
+    writer._write_values(values)
+    writer.close()
+    bulk_time = time.time() - t0
+
+    writer = Writer(file_path,auto_numbering = False)
+    t0 = time.time()
+    for data_point in values:
+        writer.add_data_point(data_point)
+    writer.close()
+    point_time = time.time() - t0
+
+    print('write {0:d} rows : {1:.3f} s in bulk, {2:.3f} s point by point ({3:.1f}x)'.format(number_of_rows,bulk_time,point_time,point_time/bulk_time))
+
+if __name__ == '__main__':
+
+    benchmark_reader_engines()
+    benchmark_example_files()
+    benchmark_column_executor()
+    benchmark_writer()
@@ -1,19 +1,165 @@
+import asyncio
+import os
+
+import numpy as np
+
+from . import Compression
+
 class HotReader():
     def __init__(self,reader,file_path):
 
         self.reader = reader
         self.file_path = file_path
 
-        self.data_curve = self.reader.read(file_path)
+        self._load()
+
+    def _load(self):
+        """ Read the header and all the complete data lines of the file. 
+        An incomplete last line is left for follow.
+        """
+
+        self.reader._start(self.file_path)
+        self.data_curve = self.reader._new_data_curve(np.zeros((0,len(self.reader.column_names))))
+
+        stat = os.stat(self.file_path)
+        self._inode = stat.st_ino
+        self._offset = self.reader.data_offset
+        if self.reader.compression is not None:
+            self._start_decompressor()
+        self._read_new_lines(stat)
+
+    def _start_decompressor(self):
+        """ Decompress a compressed file from its start, skipping the bytes before the offset reached """
+
+        self._decompressor = Compression.Decompressor(self.file_path,self.reader.compression)
+        self._skip = self._offset
+        self._remainder = b''
 
     def read_data_line(self):
 
+        if self.reader.compression is not None:
+            self.reader.f_id.seek(self._offset)
         good_line, new_data = self.reader._read_data_line()
-        if good_line:
-            self.data_curve.add_data_point(new_data)
+        if good_line and new_data is not None:
+            self._add_values(new_data[np.newaxis,:])
+        self._offset = self.reader.f_id.tell()
+        if self.reader.compression is not None:
+            self._start_decompressor()
 
         return good_line
 
+    def follow(self):
+        """ Read all the complete lines appended to the file since the last call. 
+        An incomplete last line is left for the next call.
+        If the file was truncated or replaced, it is read again from the start.
+        A compressed file keeps its decompression state between the calls, so only the compressed 
+        bytes appended since the last call are decompressed (ex : gzip members appended to the file).
+
+        Return the number of new data points
+        """
+
+        stat = os.stat(self.file_path)
+        if stat.st_ino != self._inode or stat.st_size < self._size:
+            self.reader.f_id.close()
+            self._load()
+            return self.data_curve.data_length
+
+        if stat.st_size == self._size:
+            return 0
+
+        return self._read_new_lines(stat)
+
+    def _read_new_lines(self,stat):
+        """ Parse the complete lines after the offset reached, by blocks of reader.block_size bytes 
+        (the offset is in the decompressed data for a compressed file)
+
+        Return the number of new data points
+        """
+
+        if self.reader.compression is not None:
+            return self._read_new_compressed_lines(stat)
+
+        number_of_new_rows = 0
+        with open(self.file_path,'rb') as f_id:
+            f_id.seek(self._offset)
+            remainder = b''
+            while True:
+                block = f_id.read(self.reader.block_size)
+                if not block:
+                    break
+                new_bytes = remainder + block
+                end = new_bytes.rfind(b'\n') + 1
+                remainder = new_bytes[end:]
+                if end:
+                    number_of_new_rows += self._parse_new_lines(new_bytes[:end])
+        self._size = stat.st_size
+        self.reader.f_id.seek(self._offset)
+
+        return number_of_new_rows
+
+    def _read_new_compressed_lines(self,stat):
+        """ _read_new_lines for a compressed file. The bytes of an incomplete last line are kept 
+        in memory, the decompressor continues after the compressed bytes already read.
+        """
+
+        number_of_new_rows = 0
+        while True:
+            block = self._decompressor.read(self.reader.block_size)
+            if not block:
+                break
+            if self._skip:
+                skipped = len(block[:self._skip])
+                block = block[skipped:]
+                self._skip -= skipped
+            new_bytes = self._remainder + block
+            end = new_bytes.rfind(b'\n') + 1
+            self._remainder = new_bytes[end:]
+            if end:
+                number_of_new_rows += self._parse_new_lines(new_bytes[:end])
+        self._size = stat.st_size
+
+        return number_of_new_rows
+
+    def _parse_new_lines(self,new_bytes):
+        """ Add the data points of complete lines and move the offset after them """
+
+        values = self.reader._parse_data(new_bytes)
+        self._add_values(values)
+        self._offset += len(new_bytes)
+
+        return len(values)
+
+    def _add_values(self,values):
+        """ Add parsed values to the DataCurve. An integer column receiving non integral values 
+        is converted to float64 instead of truncating them.
+        """
+
+        column_dtypes = self.reader._checked_dtypes(values)
+        if column_dtypes != self.reader.column_dtypes:
+            self.reader.column_dtypes = column_dtypes
+            old_values = np.column_stack([self.data_curve.get_column_data(column_name) for column_name in self.data_curve.get_column_names()])
+            self.data_curve = self.reader._new_data_curve(np.concatenate([old_values.reshape(-1,values.shape[1]),values]))
+        else:
+            self.data_curve.add_data_points(values)
+
+    async def iter_new_rows(self,interval = 0.1,executor = None):
+        """ Asynchronous iterator over the data points appended to the file
+
+        interval : delay in seconds between two calls to follow when there is no new data point
+        executor : executor running follow (default to the event loop default executor)
+
+        Yield (n, number of columns) arrays of the new data points. 
+        If the file was truncated or replaced, all the data points of the new file are yielded.
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            number_of_new_rows = await loop.run_in_executor(executor,self.follow)
+            if number_of_new_rows:
+                yield np.column_stack([self.data_curve.get_column_data(column_name)[-number_of_new_rows:] for column_name in self.data_curve.get_column_names()])
+            else:
+                await asyncio.sleep(interval)
+
     def get_file_path(self):
 
         return self.file_path
@@ -32,4 +178,4 @@ class HotReader():
 
     def get_column_by_name(self,column_name):
 
-        return self.data_curve.get_column_by_name(column_name)
\ No newline at end of file
+        return self.data_curve.get_column_by_name(column_name)
@@ -1,10 +1,242 @@
 import numpy as np
+import asyncio
+import copy
+import functools
+import hashlib
+import os
 import re
-from .DataContainer import DataCurve
+import mmap
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from numpy.lib.stride_tricks import sliding_window_view
+from .DataContainer import DataCurve, DataCurveSequence, LazyColumn, Column
+from . import BinaryFormat
+from . import Compression
+
+REGEX_CHARACTERS = set('.^$*+?{}[]\\|()')
+
+# Line indexes kept in memory when there is no cache to persist them
+_line_indexes = dict()
+LINE_INDEXES_IN_MEMORY = 16
+
+# Parsed header layouts, keyed by the reader configuration and a fingerprint of the header
+_layouts = dict()
+LAYOUTS_IN_MEMORY = 256
+
+# Compiled expressions of the header parsers
+MD_HEADER_START = re.compile(rb"\[(?:Header|Instrument List)\]")
+MD_HEADER_END = re.compile(rb"\[(?:Header end|Instrument List end)\]")
+MD_COLUMN = re.compile(r"Column .. : (.+)")
+MD_NAME_TAB_UNITS = re.compile(r"([\w -]+)\t(.+)$")
+MD_NAME_IN_UNITS = re.compile(r"([\w -]+) in (\w+)")
+MD_LONG_NAME = re.compile(r"(.+)\s+(\w+)\s+(\w+)$")
+COLUMN_HEAD_DTYPE = re.compile(r"(.+)\{(\w+)\}$")
+COLUMN_HEAD_UNITS = re.compile(r"(.+)\((.+)\)")
+QD_DATA_START = re.compile(rb"\[Data\]")
+
+def _to_float(fields):
+    """ Convert a list of strings to a float array. Fields that cannot be converted are set to 0 """
+
+    try:
+        return np.array(fields,dtype = float)
+    except ValueError:
+        values = np.zeros((len(fields),))
+        for i, field in enumerate(fields):
+            try:
+                values[i] = float(field)
+            except ValueError:
+                pass
+
+        return values
+
+def _checked_dtype(values,dtype,column_name):
+    """ dtype of a column whose values were parsed as floats. An integer dtype is kept only 
+    if all the values are integral and in its range, else the column is flagged with a warning 
+    and kept in float64 (None) instead of truncating the values.
+    """
+
+    if dtype is None or np.dtype(dtype).kind not in 'iu' or not len(values):
+        return dtype
+
+    info = np.iinfo(dtype)
+    with np.errstate(invalid = 'ignore'):
+        integral = np.all((values == np.round(values)) & (values >= info.min) & (values <= info.max))
+    if integral:
+        return dtype
+
+    warnings.warn('Non integral values in the {0:s} column {1:s}, read as float64'.format(np.dtype(dtype).name,column_name))
+
+    return None
+
+def _text_lines(text,keep_ends = False):
+    """ Lines of a text as read by readline with universal new lines
+
+    keep_ends : keep the new line character at the end of the lines, as readline does
+    """
+
+    if '\r' in text:
+        text = text.replace('\r\n','\n').replace('\r','\n')
+    lines = text.split('\n')
+    last_line = lines.pop()
+    if keep_ends:
+        lines = [line + '\n' for line in lines]
+    if last_line:
+        lines.append(last_line)
+
+    return lines
+
+def _line_end(head,line_start,at_end,search_start = 0):
+    """ Offset after the end of the line starting at line_start, the line ending with \n, \r\n or \r 
+    as read by readline with universal new lines. -1 if the end of the line is not in head yet.
+
+    at_end : True if head holds the whole file
+    search_start : offset from which the end of the line is searched (there is none before it)
+    """
+
+    position = max(line_start,search_start)
+    line_feed = head.find(b'\n',position)
+    carriage_return = head.find(b'\r',position,len(head) if line_feed < 0 else line_feed)
+    if carriage_return < 0:
+        return line_feed + 1 if line_feed >= 0 else -1
+    if carriage_return + 1 < len(head):
+        return carriage_return + 2 if head[carriage_return + 1] == ord('\n') else carriage_return + 1
+
+    # a \r ending the bytes read can be followed by a \n
+    return len(head) if at_end else -1
+
+class MappedDataIndex(object):
+    """ Index of the data lines of a memory mapped data file 
+
+    The file is scanned once with numpy to find the start and end byte offsets of every 
+    data line with enough fields. Columns are then decoded one at a time on demand.
+    The lines must end with \n or \r\n : the scan stops at the first \r ending a line on its own
+    and sets carriage_return_line_ends, the file is then to be read with another engine.
+    """
+
+    carriage_return_line_ends = False
+
+    scan_size = 2**24
+    batch_size = 2**16
+
+    def __init__(self,file_path,data_offset,separator,min_fields):
+        """ Initialize a MappedDataIndex
+
+        file_path : full path to the data file
+        data_offset : byte offset of the first data line
+        separator : single byte separator
+        min_fields : minimal number of fields of a data line
+        """
+
+        with open(file_path,'rb') as f_id:
+            if os.fstat(f_id.fileno()).st_size > data_offset:
+                self.buffer = mmap.mmap(f_id.fileno(),0,access = mmap.ACCESS_READ)
+            else:
+                # no data line (an empty file cannot be memory mapped)
+                self.buffer = b''
+
+        self.data = np.frombuffer(self.buffer,dtype = np.uint8)
+        self.separator = separator[0]
+        self._index_lines(data_offset,min_fields)
+
+    def __len__(self):
+
+        return len(self.starts)
+
+    def _index_lines(self,data_offset,min_fields):
+        """ Find the data lines by scanning the file by chunks of self.scan_size bytes """
+
+        starts = list()
+        ends = list()
+        size = len(self.data)
+        position = data_offset
+        scan_size = self.scan_size
+        while position < size:
+            chunk = self.data[position:position + scan_size]
+            line_ends = np.flatnonzero(chunk == 10)
+            if position + scan_size < size:
+                if not len(line_ends):
+                    scan_size *= 2
+                    continue
+                chunk = chunk[:line_ends[-1] + 1]
+            elif not len(line_ends) or line_ends[-1] < len(chunk) - 1:
+                line_ends = np.append(line_ends,len(chunk))
+
+            carriage_returns = np.flatnonzero(chunk == 13)
+            if len(carriage_returns) and np.any(chunk[np.minimum(carriage_returns + 1,len(chunk) - 1)] != 10):
+                self.carriage_return_line_ends = True
+                break
+
+            line_starts = np.concatenate(([0],line_ends[:-1] + 1))
+            separators = np.flatnonzero(chunk == self.separator)
+            field_numbers = np.diff(np.searchsorted(separators,line_ends),prepend = 0) + 1
+            valid = field_numbers >= min_fields
+
+            starts.append(line_starts[valid] + position)
+            ends.append(line_ends[valid] + position)
+            position += len(chunk)
+            scan_size = self.scan_size
+
+        if starts:
+            self.starts = np.concatenate(starts)
+            self.ends = np.concatenate(ends)
+        else:
+            self.starts = np.zeros((0,),dtype = np.int64)
+            self.ends = np.zeros((0,),dtype = np.int64)
+
+    def read_column(self,column_number):
+        """ Decode the field column_number of every data line. Missing or non numeric fields are set to 0 """
+
+        values = np.zeros((len(self),))
+        for i0 in range(0,len(self),self.batch_size):
+            i1 = min(i0 + self.batch_size,len(self))
+            values[i0:i1] = self._read_field(column_number,self.starts[i0:i1],self.ends[i0:i1])
+
+        return values
+
+    def _read_field(self,column_number,starts,ends):
+
+        separators = np.flatnonzero(self.data[starts[0]:ends[-1]] == self.separator) + starts[0]
+        separators = np.append(separators,ends[-1]) # sentinel, never counted since searchsorted is left sided
+        first_separators = np.searchsorted(separators,starts)
+        separator_numbers = np.searchsorted(separators,ends) - first_separators
+
+        present = separator_numbers >= column_number
+        if column_number > 0:
+            field_starts = separators[np.minimum(first_separators + column_number - 1,len(separators) - 1)] + 1
+        else:
+            field_starts = starts.copy()
+        last = separator_numbers == column_number
+        field_ends = np.where(last,ends,separators[np.minimum(first_separators + column_number,len(separators) - 1)])
+        field_starts[~present] = 0
+        field_ends[~present] = 0
+
+        widths = field_ends - field_starts
+        width = max(int(widths.max()),1)
+        offsets = np.arange(width)
+        last_start = len(self.data) - width
+        characters = sliding_window_view(self.data,width)[np.minimum(field_starts,last_start)]
+        near_end = field_starts > last_start
+        if near_end.any():
+            characters[near_end] = self.data[np.minimum(field_starts[near_end,np.newaxis] + offsets,len(self.data) - 1)]
+        characters = np.where(offsets < widths[:,np.newaxis],characters,ord(' ')).astype(np.uint8)
+        fields = np.ascontiguousarray(characters).view('S{0:d}'.format(width)).ravel()
+
+        try:
+            return fields.astype(float)
+        except ValueError:
+            return _to_float(list(fields))
 
 class Reader(object):
 
     codec = 'utf-8'
+    engine = 'line'
+    block_size = 2**20
+    header_block_size = 2**16
+    cache = None
+    compression = None
+    configuration_attributes = ('codec','separator')
+    layout_attributes = ()
 
     def __init__(self):
 
@@ -14,46 +246,252 @@ class Reader(object):
 
         return str(self.get_column_names())
 
-    def read(self,file_path):
+    def read(self,file_path,engine = None,columns = None,cache = None,rows = None):
         """ Read a file 
 
         file_path : full path to the data file
+        engine : 'line' to parse one line at a time, 'block' to parse large blocks 
+            of lines with numpy or 'mmap' to memory map the file and decode each column 
+            on first access (default to the Reader engine attribute). Compressed files 
+            are read with the block engine instead of the mmap engine.
+        columns : list of column names or column indexes to read (default all columns). 
+            The other fields are neither split nor converted.
+        cache : SidecarCache used to store and load a binary copy of the data 
+            (default to the Reader cache attribute, False to disable)
+        rows : slice of the data points to read. Only these lines are parsed, using an index 
+            of the data lines built once per file and persisted in the cache.
+
+        Return the data formated into a DataContainer
+        """
+
+        if engine is None:
+            engine = self.engine
+        if cache is None:
+            cache = self.cache
+
+        if rows is not None:
+            return self._read_rows(file_path,rows,columns,cache)
+
+        if cache:
+            configuration = self.get_configuration(columns)
+            data_curve = cache.load(file_path,configuration)
+            if data_curve is not None:
+                self.column_names = data_curve.get_column_names()
+                self.column_units = data_curve.get_column_unitss()
+                return data_curve
+
+        self._start(file_path,columns)
+        
+        if engine == 'line':
+            data_curve = self._read_data()
+        elif engine == 'block':
+            data_curve = self._read_data_blocks()
+        elif engine == 'mmap':
+            data_curve = self._read_data_mapped(file_path)
+        else:
+            raise ValueError('Unknown engine : {0:s}'.format(str(engine)))
+
+        if cache:
+            cache.store(file_path,configuration,data_curve)
+
+        return data_curve            
+
+    async def aread(self,file_path,executor = None,**read_kwargs):
+        """ Read a file in an executor without blocking the asyncio event loop
+
+        file_path : full path to the data file
+        executor : executor running the read (default to the event loop default executor)
+        read_kwargs : arguments of read
+
+        The file is read by a copy of the Reader, so the same Reader can read several files at once.
 
         Return the data formated into a DataContainer
         """
 
+        reader = copy.copy(self)
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(executor,functools.partial(reader.read,file_path,**read_kwargs))
+
+    def _read_rows(self,file_path,rows,columns,cache):
+        """ Read a slice of the data points. Only the lines of the slice are parsed.
+        Fall back on parsing everything when the separator is not a single byte, the file is compressed
+        or its lines end with \r.
+
+        Return the data formated into a DataContainer
+        """
+
+        self._start(file_path,columns)
+        try:
+            separator = self.separator.encode(self.codec)
+            line_index = None
+            if len(separator) == 1 and REGEX_CHARACTERS.isdisjoint(self.separator) and self.compression is None:
+                line_index = self._line_index(file_path,separator,cache)
+
+            if line_index is None:
+                blocks = list(self._iter_value_blocks())
+                if blocks:
+                    values = np.concatenate(blocks)
+                else:
+                    values = np.zeros((0,len(self.column_names)))
+                return self._new_data_curve(values[rows])
+
+            starts, ends = line_index
+            row_indexes = np.arange(len(starts))[rows]
+            if not len(row_indexes):
+                return self._new_data_curve(np.zeros((0,len(self.column_names))))
+
+            first_row, last_row = row_indexes.min(), row_indexes.max()
+            with open(file_path,'rb') as f_id:
+                f_id.seek(starts[first_row])
+                values = self._parse_data(f_id.read(ends[last_row] - starts[first_row]))
+        finally:
+            self.f_id.close()
+
+        return self._new_data_curve(values[row_indexes - first_row])
+
+    def _line_index(self,file_path,separator,cache):
+        """ Start and end byte offsets of the data lines of a file, None if the lines end with \r.
+        The index is persisted in the cache or kept in memory when there is no cache.
+        """
+
+        configuration = self.get_configuration()
+        if cache:
+            line_index = cache.load_line_index(file_path,configuration)
+        else:
+            stat = os.stat(file_path)
+            key = (os.path.abspath(file_path),stat.st_size,stat.st_mtime_ns,repr(sorted(configuration.items())))
+            line_index = _line_indexes.get(key)
+
+        if line_index is None:
+            mapped_data_index = MappedDataIndex(file_path,self.data_offset,separator,self._min_fields)
+            if mapped_data_index.carriage_return_line_ends:
+                return None
+            line_index = mapped_data_index.starts, mapped_data_index.ends
+            if cache:
+                cache.store_line_index(file_path,configuration,*line_index)
+            else:
+                if len(_line_indexes) >= LINE_INDEXES_IN_MEMORY:
+                    _line_indexes.pop(next(iter(_line_indexes)))
+                _line_indexes[key] = line_index
+
+        return line_index
+
+    def get_configuration(self,columns = None):
+        """ Describe the reader settings listed in configuration_attributes. 
+        Used to check that cached data was read with the same settings.
+
+        columns : list of column names or column indexes to read
+        """
+
+        configuration = {'reader' : '{0:s}.{1:s}'.format(type(self).__module__,type(self).__qualname__)}
+        for attribute in self.configuration_attributes:
+            configuration[attribute] = repr(getattr(self,attribute,None))
+        configuration['columns'] = repr(columns)
+
+        return configuration
+
+    def iter_chunks(self,file_path,chunk_rows = 100000,columns = None):
+        """ Read a file by chunks with the block engine. The memory used does not depend on the file size.
+
+        file_path : full path to the data file
+        chunk_rows : number of data points in each chunk (the last one can be shorter)
+        columns : list of column names or column indexes to read (default all columns)
+
+        Yield DataContainers with the same columns
+        """
+
+        self._start(file_path,columns)
+
+        values_blocks = list()
+        number_of_rows = 0
+        try:
+            for values in self._iter_value_blocks():
+                values_blocks.append(values)
+                number_of_rows += len(values)
+                while number_of_rows >= chunk_rows:
+                    values = np.concatenate(values_blocks)
+                    yield self._new_data_curve(values[:chunk_rows])
+                    values_blocks = [values[chunk_rows:]]
+                    number_of_rows -= chunk_rows
+
+            if number_of_rows:
+                yield self._new_data_curve(np.concatenate(values_blocks))
+        finally:
+            self.f_id.close()
+
+    def _start(self,file_path,columns = None):
+        """ Open the file, read the header and prepare the column layout for reading the data part 
+
+        file_path : full path to the data file
+        columns : list of column names or column indexes to read (default all columns)
+        """
+
         self._open_file(file_path)
         self._read_header()
+        self.data_offset = self.f_id.tell()
 
         self.column_names, self.column_units, self.column_numbers = self.define_column_names_units_numbers()
+        self.column_dtypes = self.define_column_dtypes()
+        self._min_fields = len(self.column_names)
+        self._last_column_number = max(self.column_numbers,default = 0)
+        if columns is not None:
+            self._select_columns(columns)
         self._init_data_mapper()
-        
-        data_curve = self._read_data()
-
-        return data_curve            
 
     def _open_file(self,file_path):
         """ Open a file. Set the file as the active file. 
         
-        file_path : full path to the data file
+        file_path : full path to the data file. gzip, bz2 and xz files are decompressed 
+            while they are read (see Compression).
 
         Store the file ID in the Reader
         """
 
         try:
-            self.f_id = open(file_path,'r',encoding = self.codec)
+            self.compression = Compression.compression_of(file_path)
+            if self.compression is None:
+                self.f_id = open(file_path,'r',encoding = self.codec)
+            else:
+                self.f_id = Compression.open_file(file_path,'rt',self.compression,encoding = self.codec)
 
         except IOError:
             print("Cannot open {0:s}".format(file_path))
             raise
 
-    def _new_data_curve(self):
-        """ Create the DataContainer with the field names and units """
+    def _new_data_curve(self,values = None):
+        """ Create the DataContainer with the field names and units 
+
+        values : optional (n, number of columns) array used as the column data. 
+            Integer columns with non integral values are kept in float64 (see _checked_dtypes).
+        """
+
+        column_dtypes = self.column_dtypes
+        if values is not None:
+            column_dtypes = self._checked_dtypes(values)
         
-        data_curve = DataCurve(column_names = self.column_names,column_units_labels = self.column_units)
+        data_curve = DataCurve(column_names = self.column_names,column_units_labels = self._column_units_labels(),column_dtypes = column_dtypes)
+        if values is not None:
+            data_curve.set_values_array(values)
 
         return data_curve
 
+    def _checked_dtypes(self,values):
+        """ column_dtypes, with None (float64) for the integer columns holding non integral values 
+
+        values : (n, number of columns) array of the parsed values
+        """
+
+        return [_checked_dtype(values[:,i],dtype,column_name) for i, (column_name, dtype) in enumerate(zip(self.column_names,self.column_dtypes))]
+
+    def _column_units_labels(self):
+        """ Units of each column, empty strings if the units are not all defined """
+
+        if len(self.column_units) == len(self.column_names):
+            return self.column_units
+        else:
+            return [''] * len(self.column_names)
+
     def define_column_names_units_numbers(self):
         """ Define three list : column_names, column_units and column_numbers. 
         This is Reader dependant. 
@@ -62,6 +500,38 @@ class Reader(object):
 
         pass
 
+    def define_column_dtypes(self):
+        """ Define the list of numpy dtypes of the columns, in the same order as column_names. 
+        None keeps the default float64. This is Reader dependant.
+        """
+
+        return [None] * len(self.column_names)
+
+    def _select_columns(self,columns):
+        """ Keep only some columns in column_names, column_units and column_numbers 
+
+        columns : list of column names or column indexes (as in get_column_index)
+        """
+
+        indexes = list()
+        for column in columns:
+            if isinstance(column,str):
+                if column not in self.column_names:
+                    raise ValueError('Unknown column : {0:s}'.format(column))
+                indexes.append(self.column_names.index(column))
+            elif -len(self.column_names) <= column < len(self.column_names):
+                indexes.append(column)
+            else:
+                raise ValueError('Unknown column index : {0:d}'.format(column))
+
+        if len(self.column_units) == len(self.column_names):
+            self.column_units = [self.column_units[i] for i in indexes]
+        else:
+            self.column_units = list()
+        self.column_names = [self.column_names[i] for i in indexes]
+        self.column_numbers = [self.column_numbers[i] for i in indexes]
+        self.column_dtypes = [self.column_dtypes[i] for i in indexes]
+
     def _init_data_mapper(self):
         """ Initialise the data_mapper 
 
@@ -73,6 +543,30 @@ class Reader(object):
             data_mapper[column_name] = self.column_numbers[i]
 
         self.data_mapper = data_mapper
+        self._split_line = self._line_splitter()
+        self._fast_parse_columns = self._loadtxt_columns()
+        self._fill_fields = False
+        # a regular expression separator can match the new line kept at the end of the lines by _read_data_line
+        self._split_new_line = not REGEX_CHARACTERS.isdisjoint(self.separator)
+
+    def _line_splitter(self):
+        """ Return a function splitting a line on the separator.
+        Plain separators use str.split, others are treated as regular expressions.
+        The split stops after the last field needed, keeping enough fields to check that 
+        the line has at least as many fields as the complete column list.
+        """
+
+        if min(self.column_numbers,default = 0) < 0:
+            maxsplit = -1
+        else:
+            maxsplit = max(max(self.column_numbers,default = 0) + 1,self._min_fields - 1)
+
+        if REGEX_CHARACTERS.isdisjoint(self.separator):
+            separator = self.separator
+            return lambda line: line.split(separator,maxsplit)
+        else:
+            pattern = re.compile(self.separator)
+            return lambda line: pattern.split(line,max(maxsplit,0))
 
     def _read_data_line(self):
         """ Read a data line
@@ -82,8 +576,8 @@ class Reader(object):
         """
 
         line = self.f_id.readline()
-        splited_line = re.split(self.separator,line)
-        if len(splited_line) >= len(self.column_names):
+        splited_line = self._split_line(line)
+        if len(splited_line) >= self._min_fields:
             new_data = self.map_data_line(splited_line)
         else:
             new_data = None
@@ -91,8 +585,54 @@ class Reader(object):
         return bool(line), new_data
 
     def _read_header(self):
-        """ Read the header of the active data file. This is Reader dependant.
-        Should fill self._column_names and self._units with relevant strings
+        """ Read the header of the active data file and move to the data part.
+        The header is located in the raw bytes by _scan_header. The part defining the layout is parsed
+        by _parse_header only the first time it is seen, the layout_attributes are then reused.
+        """
+
+        raw_file = self.f_id.buffer
+        raw_file.seek(0)
+        head = bytearray()
+        state = dict()
+        while True:
+            block = raw_file.read(self.header_block_size)
+            state['start'] = len(head)
+            head += block
+            header = self._scan_header(head,not block,state)
+            if header is not None:
+                break
+        data_offset, layout_head = header
+
+        key = (repr(sorted(self.get_configuration().items())),hashlib.sha1(layout_head).digest())
+        layout = _layouts.get(key)
+        if layout is None:
+            self._parse_header(layout_head.decode(self.codec))
+            if len(_layouts) >= LAYOUTS_IN_MEMORY:
+                _layouts.pop(next(iter(_layouts)))
+            _layouts[key] = {attribute : list(getattr(self,attribute)) for attribute in self.layout_attributes}
+        else:
+            for attribute, value in layout.items():
+                setattr(self,attribute,list(value))
+
+        self.f_id.seek(data_offset)
+
+    def _scan_header(self,head,at_end,state):
+        """ Locate the header in the first bytes of the file. This is Reader dependant.
+
+        head : bytes read from the begining of the file
+        at_end : True if head holds the whole file
+        state : dict kept between the calls for a file. state['start'] is the offset of the bytes added 
+            since the previous call. The scan stores its progress in it to only scan the new bytes.
+
+        Return the byte offset of the data part and the bytes defining the column layout,
+        None if more bytes are needed
+        """
+
+        return 0, b''
+
+    def _parse_header(self,layout_head):
+        """ Parse the part of the header defining the column layout. This is Reader dependant.
+        Should fill the layout_attributes (ex : self._column_names and self._units) with relevant strings
         """
 
         pass
@@ -103,7 +643,7 @@ class Reader(object):
         Return the data formated into a DataContainer
         """
 
-        data_curve = self._new_data_curve()
+        data_curve = DataCurve(column_names = self.column_names,column_units_labels = self._column_units_labels())
         while True:
             # try:
                 keep_reading, new_data = self._read_data_line()
@@ -117,7 +657,212 @@ class Reader(object):
 
         data_curve._crop()
 
-        return data_curve
+        return self._new_data_curve(data_curve.get_values_array())
+
+    def _read_data_blocks(self):
+        """ Read the data part of the file by large blocks of lines 
+
+        Return the data formated into a DataContainer
+        """
+
+        blocks = list(self._iter_value_blocks())
+        if blocks:
+            values = np.concatenate(blocks)
+        else:
+            values = np.zeros((0,len(self.column_names)))
+
+        return self._new_data_curve(values)
+
+    def _read_data_mapped(self,file_path):
+        """ Memory map the data part of the file. Only the data lines positions are read, 
+        the columns are decoded when accessed for the first time.
+        Fall back on _read_data_blocks when the separator is not a single byte, the file is compressed
+        or its lines end with \r.
+
+        Return the data formated into a DataContainer
+        """
+
+        separator = self.separator.encode(self.codec)
+        if len(separator) != 1 or not REGEX_CHARACTERS.isdisjoint(self.separator) or self.compression is not None:
+            return self._read_data_blocks()
+
+        index = MappedDataIndex(file_path,self.data_offset,separator,self._min_fields)
+        if index.carriage_return_line_ends:
+            return self._read_data_blocks()
+
+        column_dict = dict()
+        for column_name, column_units_label, column_dtype in zip(self.column_names,self._column_units_labels(),self.column_dtypes):
+            def loader(column_number = self.data_mapper[column_name],column_name = column_name,column_dtype = column_dtype):
+                values = index.read_column(column_number)
+                return values.astype(_checked_dtype(values,column_dtype,column_name) or values.dtype,copy = False)
+            column_dict[column_name] = LazyColumn(column_name,column_units_label,loader,len(index),loader_dtype = np.float64 if column_dtype is None else column_dtype)
+
+        return DataCurve(column_dict = column_dict)
+
+    def _iter_value_blocks(self):
+        """ Read the data part of the file by blocks of self.block_size bytes
+
+        Yield (n, number of columns) arrays. A line cut by the end of a block is kept for the next one.
+        The blocks are read as bytes, or as text when the codec does not encode the new line as a single byte.
+        """
+
+        if '\n'.encode(self.codec) != b'\n':
+            remainder = ''
+            while True:
+                text = self.f_id.read(self.block_size)
+                if not text:
+                    break
+                lines = (remainder + text).split('\n')
+                remainder = lines.pop()
+                if self._split_new_line:
+                    lines = [line + '\n' for line in lines]
+                yield self._parse_lines(lines)
+
+            if remainder:
+                yield self._parse_lines([remainder])
+            return
+
+        raw_file = self.f_id.buffer
+        remainder = b''
+        while True:
+            block = raw_file.read(self.block_size)
+            if not block:
+                break
+            data = remainder + block
+            end = data.rfind(b'\n') + 1
+            remainder = data[end:]
+            if end:
+                yield self._parse_data(data[:end])
+
+        if remainder:
+            yield self._parse_data(remainder)
+
+    def _loadtxt_columns(self):
+        """ Columns to hand to numpy.loadtxt when parsing blocks of lines, None if loadtxt can not be used.
+        loadtxt needs a single character separator. Blank lines are skipped by loadtxt, 
+        which is only the behaviour of _read_data_line when there is more than one column. 
+        When the selected columns do not guarantee that a line has enough fields, the last column 
+        is also read and dropped. A block that loadtxt can not read is parsed line by line.
+        """
+
+        if not (len(self.separator) == 1 and REGEX_CHARACTERS.isdisjoint(self.separator)):
+            return None
+        if self._min_fields < 2 or not self.column_numbers or min(self.column_numbers) < 0:
+            return None
+
+        usecols = list(self.column_numbers)
+        if max(usecols) + 1 < self._min_fields:
+            if self._last_column_number + 1 < self._min_fields:
+                return None
+            usecols.append(self._last_column_number)
+
+        return usecols
+
+    def _parse_data(self,data):
+        """ Parse the bytes of data lines at once 
+
+        data : bytes of complete lines, only the last one can miss its new line character
+
+        The lines are handed to loadtxt, which reads the \r of \r\n new lines as a line end. 
+        Once loadtxt fails on a block, the empty fields are filled with 0, their value in _read_data_line, 
+        before handing the lines to loadtxt.
+        Return a (n, number of columns) array with the data in the same order as column_names
+        """
+
+        if self._fast_parse_columns:
+            if not self._fill_fields:
+                values = self._loadtxt_lines(self._decode(data).split('\n'))
+                if values is not None:
+                    return values
+                self._fill_fields = True
+            values = self._loadtxt_lines(self._decode(self._fill_empty_fields(data)).split('\n'))
+            if values is not None:
+                return values
+
+        return self._split_lines(_text_lines(self._decode(data),self._split_new_line))
+
+    def _decode(self,data):
+        """ Decode data read as bytes. Data lines are mostly ASCII, which has a faster decoder than most codecs. """
+
+        if '\n'.encode(self.codec) == b'\n':
+            try:
+                return data.decode('ascii')
+            except UnicodeDecodeError:
+                pass
+
+        return data.decode(self.codec)
+
+    def _fill_empty_fields(self,data):
+        """ Insert a 0 in the empty fields of data lines """
+
+        characters = np.frombuffer(data,dtype = np.uint8)
+        separator = self.separator.encode(self.codec)[0]
+        separators = characters == separator
+        field_ends = separators | (characters == ord('\n')) | (characters == ord('\r'))
+
+        # positions after a separator followed by the end of a field or the end of the data, 
+        # and positions of separators starting a line
+        positions = [np.flatnonzero(separators[:-1] & field_ends[1:]) + 1,np.flatnonzero(separators[1:] & (characters[:-1] == ord('\n'))) + 1]
+        if len(characters) and separators[0]:
+            positions.append([0])
+        if len(characters) and separators[-1]:
+            positions.append([len(characters)])
+        positions = np.concatenate(positions)
+        if not len(positions):
+            return data
+
+        return np.insert(characters,np.sort(positions),ord('0')).tobytes()
+
+    def _parse_lines(self,lines):
+        """ Parse a list of data lines at once 
+
+        Lines with less fields than the complete column list are skipped like in _read_data_line.
+        Return a (n, number of columns) array with the data in the same order as column_names
+        """
+
+        if self._fast_parse_columns and lines:
+            values = self._loadtxt_lines(lines)
+            if values is not None:
+                return values
+
+        return self._split_lines(lines)
+
+    def _loadtxt_lines(self,lines):
+        """ Parse lines with loadtxt. Return None if loadtxt can not read them """
+
+        if not lines:
+            return None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore') # loadtxt warns on blocks of blank lines
+                values = np.loadtxt(lines,delimiter = self.separator,comments = None,usecols = self._fast_parse_columns,ndmin = 2)
+        except ValueError:
+            return None
+        if values.shape[1] != len(self._fast_parse_columns):
+            return None
+
+        return values[:,:len(self.column_names)]
+
+    def _split_lines(self,lines):
+        """ Parse lines by splitting them in Python, with the same rules as _read_data_line """
+
+        rows = [self._split_line(line) for line in lines]
+        rows = [row for row in rows if len(row) >= self._min_fields]
+
+        values = np.zeros((len(rows),len(self.column_names)))
+        if not rows:
+            return values
+
+        shortest_row = min(map(len,rows))
+        for i_column, column_name in enumerate(self.column_names):
+            column_number = self.data_mapper[column_name]
+            if column_number < shortest_row:
+                fields = list(map(itemgetter(column_number),rows))
+            else:
+                fields = [row[column_number] if column_number < len(row) else '' for row in rows]
+            values[:,i_column] = _to_float(fields)
+
+        return values
 
     def map_data_line(self,splited_line):
         """ Map a splited data line and map selected column in the same order as column_names """
@@ -146,19 +891,24 @@ class Reader(object):
 
 class GenericDataReader(Reader):
     """ GenericDataReader can be customized to read any ASCII character separated data file """
-    def __init__(self,separator,column_names,column_units = list(),nb_head_lines = 0):
+
+    configuration_attributes = Reader.configuration_attributes + ('_column_names','_units','_nb_head_lines','_dtypes')
+
+    def __init__(self,separator,column_names,column_units = list(),nb_head_lines = 0,column_dtypes = None):
         """ Initialize a GenericDataReader
 
         separator : Character(s) separating the data (ex : ',' or '\t')
         column_names : List of data columns
         column_units : List of units string in the same order as column_names (optional)
         nb_head_lines : Number of lines to skip at the begining of the file (default = 0)
+        column_dtypes : List of numpy dtypes in the same order as column_names (optional, default float64)
         """
         
         self.separator = separator
         self._column_names = column_names
         self._units = column_units
         self._nb_head_lines = nb_head_lines
+        self._dtypes = column_dtypes
 
         super().__init__()
 
@@ -166,31 +916,65 @@ class GenericDataReader(Reader):
 
         return self._column_names, self._units, list(range(len(self._column_names)))
 
-    def _read_header(self):
-        """ Read the header of the active data file."""
+    def define_column_dtypes(self):
 
-        header_lines = list()
+        if self._dtypes is None:
+            return Reader.define_column_dtypes(self)
 
-        for n in range(self._nb_head_lines):
-            header_lines.append(self.f_id.readline())
+        return list(self._dtypes)
+
+    def _scan_header(self,head,at_end,state):
+        """ Skip the nb_head_lines first lines """
+
+        data_offset = state.get('data_offset',0)
+        skipped_lines = state.get('skipped_lines',0)
+        while skipped_lines < self._nb_head_lines:
+            line_end = _line_end(head,data_offset,at_end,state['start'] - 1)
+            if line_end < 0:
+                state.update(data_offset = data_offset,skipped_lines = skipped_lines)
+                return (len(head), b'') if at_end else None
+            data_offset = line_end
+            skipped_lines += 1
+
+        return data_offset, b''
 
 class DataColumnReader(Reader): # todo
+    """ DataColumnReader read files with a single header line of column heads : name(units){dtype}. 
+    The units and the dtype are optional. """
+
+    layout_attributes = ('_column_names','_units','_dtypes')
+
     def __init__(self,separator = ','):
 
         super().__init__()
 
         self.separator = separator
 
-    def _read_header(self):
-        header_line = self.f_id.readline()
+    def _scan_header(self,head,at_end,state):
+        """ The header is the first line """
+
+        line_end = _line_end(head,0,at_end,state['start'] - 1)
+        if line_end < 0:
+            return (len(head), bytes(head)) if at_end else None
+
+        return line_end, bytes(head[:line_end])
+
+    def _parse_header(self,header_line):
         column_heads = re.split(self.separator,header_line)
 
         column_names = list()
         column_units = list()
+        column_dtypes = list()
 
         for column_head in column_heads:
             column_head = column_head.strip()
-            m_wu = re.match(r"(.+)\((.+)\)",column_head)
+            m_dtype = COLUMN_HEAD_DTYPE.match(column_head)
+            if m_dtype:
+                column_head = m_dtype.group(1).strip()
+                column_dtypes.append(m_dtype.group(2))
+            else:
+                column_dtypes.append(None)
+            m_wu = COLUMN_HEAD_UNITS.match(column_head)
             if m_wu:
                 column_name = m_wu.group(1).strip()
                 column_unit = m_wu.group(2).strip()
@@ -203,55 +987,68 @@ class DataColumnReader(Reader): # todo
 
         self._column_names = column_names
         self._units = column_units
+        self._dtypes = column_dtypes
 
     def define_column_names_units_numbers(self):
 
         return self._column_names, self._units, list(range(len(self._column_names)))
 
+    def define_column_dtypes(self):
+
+        return self._dtypes
+
 class MDDataFileReader(Reader):
     """ MDDataFileReader read in house data file where the header contains the information
     about the column names and units."""
+
+    layout_attributes = ('_column_names','_units')
     
     def __init__(self):
 
         super().__init__()
         self.separator = ','
 
-    def _read_header(self):
-        """ Read the header lines. Store the column names and units. """
-
-        header_lines = list()
-
-        while True:
-            line = self.f_id.readline()
-            if not line:
-                break
-            m1 = re.match(r"\[Header\]",line)
-            m2 = re.match(r"\[Instrument List\]",line)
-            if m1 or m2:
-                break
-
-        while True:
-            line = self.f_id.readline()
-            if not line:
-                break
-            m1 = re.match(r"\[Header end\]",line)
-            m2 = re.match(r"\[Instrument List end\]",line)
-            if m1 or m2:
-                break
-            else:
-                header_lines.append(line.strip())
+    def _scan_header(self,head,at_end,state):
+        """ The header lines are between the [Header] and [Header end] lines 
+        (or [Instrument List] and [Instrument List end]) """
+
+        line_start = state.get('line_start',0)
+        header_start = state.get('header_start')
+        while line_start < len(head):
+            line_end = _line_end(head,line_start,at_end,state['start'] - 1)
+            if line_end < 0:
+                if not at_end:
+                    state.update(line_start = line_start,header_start = header_start)
+                    return None
+                line_end = len(head)
+            if header_start is None:
+                if MD_HEADER_START.match(head,line_start):
+                    header_start = line_end
+            elif MD_HEADER_END.match(head,line_start):
+                return line_end, bytes(head[header_start:line_start])
+            line_start = line_end
+
+        if not at_end:
+            state.update(line_start = line_start,header_start = header_start)
+            return None
+        if header_start is None:
+            return len(head), b''
+
+        return len(head), bytes(head[header_start:])
+
+    def _parse_header(self,header_lines):
+        """ Store the column names and units. """
 
         column_names = list()
         column_units = list()
-        for line in header_lines:
-            m = re.match("Column .. : (.+)",line)
+        for line in header_lines.splitlines():
+            m = MD_COLUMN.match(line.strip())
             if m:
                 subLine = m.group(1)
-                m1 = re.match(r"([\w -]+)\t(.+)$",subLine)
-                m2 = re.match(r"([\w -]+) in (\w+)",subLine)
+                m1 = MD_NAME_TAB_UNITS.match(subLine)
+                m2 = MD_NAME_IN_UNITS.match(subLine)
                 if m2:
-                    m22 = re.match(r"(.+)\s+(\w+)\s+(\w+)$",m2.group(1).strip())
+                    m22 = MD_LONG_NAME.match(m2.group(1).strip())
                     column_names.append(m22.group(2).strip())
                     column_units.append(m2.group(2).strip())
                 elif m1:
@@ -270,27 +1067,61 @@ class MDDataFileReader(Reader):
 
 class QDReader(Reader):
 
-    def _read_header(self):
-        """ Not implemented yet. Just skip to the data part. """
+    configuration_attributes = Reader.configuration_attributes + ('column_tuples',)
 
-        while True:
-            line = self.f_id.readline()
-            if bool(re.match(r"\[Data\]",line)):
-                break
-        line = self.f_id.readline()
+    def _scan_header(self,head,at_end,state):
+        """ Not parsed yet. Just skip to the data part after the [Data] line and the title line. """
+
+        line_start = state.get('line_start',0)
+        title_line = state.get('title_line',False)
+        while line_start < len(head):
+            line_end = _line_end(head,line_start,at_end,state['start'] - 1)
+            if line_end < 0:
+                if not at_end:
+                    state.update(line_start = line_start,title_line = title_line)
+                    return None
+                line_end = len(head)
+            if title_line:
+                return line_end, b''
+            title_line = QD_DATA_START.match(head,line_start) is not None
+            line_start = line_end
+
+        if not at_end:
+            state.update(line_start = line_start,title_line = title_line)
+            return None
+
+        return len(head), b''
 
     def define_column_names_units_numbers(self):
 
         column_names = list()
         column_units = list()
         column_numbers = list()
-        for column_tuple in self.column_tuples:
+        for column_tuple in self.get_column_tuples():
             column_names.append(column_tuple[1])
             column_units.append(column_tuple[2])
             column_numbers.append(column_tuple[0])
 
         return column_names, column_units, column_numbers
 
+    def define_column_dtypes(self):
+
+        column_dtypes = list()
+        for column_tuple in self.get_column_tuples():
+            if len(column_tuple) > 3:
+                column_dtypes.append(column_tuple[3])
+            else:
+                column_dtypes.append(None)
+
+        return column_dtypes
+
+    def get_column_tuples(self):
+        """ List of (column number, column name, column units) to read. 
+        A fourth element can give the numpy dtype of the column (default float64).
+        """
+
+        return self.column_tuples
+
 class SQUIDDataReader(QDReader):
     """ SQUIDDataReader read Quantum Design SQUID data file format."""
 
@@ -305,7 +1136,7 @@ class SQUIDDataReader(QDReader):
             (3,'temperature','K'),
             (4,'long moment','mA/m**2'), #ureg.milliampere*ureg.meter**2
             (5,'long scan std dev','mA/m**2'),
-            (6,'long algorithm',None),
+            (6,'long algorithm',None,'int32'),
             (7,'long reg fit',None),
             (8,'long percent error','%')
             ]
@@ -313,6 +1144,8 @@ class SQUIDDataReader(QDReader):
 class PPMSResistivityDataReader(QDReader):
     """ SQUIDDataReader read Quantum Design PPMS resistivity data file format."""
 
+    configuration_attributes = QDReader.configuration_attributes + ('sample_number',)
+
     def __init__(self):
         
         super().__init__()
@@ -324,26 +1157,44 @@ class PPMSResistivityDataReader(QDReader):
             (4,'magnetic field','Oe'),
             (5,'sample position','deg')
             ]
+        self.sample_number = 0
 
     def read(self,file_path,sample_number = 0,*vargs,**kwargs):
 
-        self.add_channel_column_tuples(sample_number)
+        self.sample_number = sample_number
 
         return Reader.read(self,file_path,*vargs,**kwargs)
 
-    def add_channel_column_tuples(self,sample_number):
+    def iter_chunks(self,file_path,sample_number = 0,*vargs,**kwargs):
+
+        self.sample_number = sample_number
+
+        return Reader.iter_chunks(self,file_path,*vargs,**kwargs)
+
+    def get_column_tuples(self):
+
+        return self.column_tuples + self.channel_column_tuples(self.sample_number)
+
+    def channel_column_tuples(self,sample_number):
+        """ Column tuples of the resistance channels. All channels if sample_number is 0. """
+
+        column_tuples = list()
         if sample_number == 0:
             for i in range(1,4):
-                self.column_tuples.append((4 + 2*i,'resistance{0:d}'.format(i),'ohm'))
-                self.column_tuples.append((5 + 2*i,'current{0:d}'.format(i),'uA'))
+                column_tuples.append((4 + 2*i,'resistance{0:d}'.format(i),'ohm'))
+                column_tuples.append((5 + 2*i,'current{0:d}'.format(i),'uA'))
 
         elif sample_number in [1,2,3]:
-            self.column_tuples.append((4 + 2*sample_number,'resistance','ohm'))
-            self.column_tuples.append((5 + 2*sample_number,'current','uA'))
+            column_tuples.append((4 + 2*sample_number,'resistance','ohm'))
+            column_tuples.append((5 + 2*sample_number,'current','uA'))
+
+        return column_tuples
 
 class PPMSACMSDataReader(QDReader):
     """ SQUIDDataReader read Quantum Design PPMS ACMS data file format."""
 
+    configuration_attributes = QDReader.configuration_attributes + ('number_of_harmonics',)
+
     def __init__(self,number_of_harmonics = 1):
 
         super().__init__()
@@ -381,7 +1232,7 @@ class PPMSHeatCapacityDataReader(QDReader):
         self.separator = ','
         self.column_tuples = [
             (0,'time','s'),
-            (1,'PPMS status',None),
+            (1,'PPMS status',None,'int32'),
             (2,'puck temperature','K'),
             (3,'system temperature','K'),
             (4,'magnetic field','Oe'),
@@ -403,4 +1254,162 @@ class PPMSHeatCapacityDataReader(QDReader):
             (20,'cal correction',None)
             ]
 
+class BinaryDataReader(Reader):
+    """ BinaryDataReader read the binary column files of BinaryDataWriter (see BinaryFormat) """
+
+    def read(self,file_path,engine = None,columns = None,cache = None,rows = None):
+        """ Read a binary data file. The file is memory mapped and nothing is parsed.
+        With a single chunk, the columns are read-only views of the map.
+        A compressed file is decompressed in memory.
+
+        file_path : full path to the data file
+        engine : not used, the file is always memory mapped
+        columns : list of column names or column indexes to read (default all columns)
+        cache : not used
+        rows : slice of the data points to read
+
+        Return the data formated into a DataContainer
+        """
+
+        buffer, header, chunks = self._map_chunks(file_path,columns)
+
+        return self._data_curve(header,[self._chunk_columns(buffer,chunk) for chunk in chunks],rows)
+
+    def iter_chunks(self,file_path,chunk_rows = 100000,columns = None):
+        """ Read a binary data file by chunks of chunk_rows data points. The chunks of the file 
+        are walked once and the data points are sliced from their views of the map.
+
+        Yield DataContainers with the same columns
+        """
+
+        buffer, header, chunks = self._map_chunks(file_path,columns)
+
+        pieces = list()
+        number_of_rows = 0
+        for chunk in chunks:
+            chunk_columns = self._chunk_columns(buffer,chunk)
+            start = 0
+            while start < chunk[2]:
+                stop = min(chunk[2],start + chunk_rows - number_of_rows)
+                pieces.append([data[start:stop] for data in chunk_columns])
+                number_of_rows += stop - start
+                start = stop
+                if number_of_rows == chunk_rows:
+                    yield self._data_curve(header,pieces)
+                    pieces = list()
+                    number_of_rows = 0
+
+        if number_of_rows:
+            yield self._data_curve(header,pieces)
+
+    def _map_chunks(self,file_path,columns):
+        """ Memory map (or decompress) a binary data file and set the columns of the reader
+
+        Return the buffer, the header dict and the (offset, column offsets, number of data points) of the chunks
+        """
+
+        self.compression = Compression.compression_of(file_path)
+        if self.compression is None:
+            with open(file_path,'rb') as f_id:
+                buffer = mmap.mmap(f_id.fileno(),0,access = mmap.ACCESS_READ)
+        else:
+            with Compression.open_file(file_path,'rb',self.compression) as f_id:
+                buffer = f_id.read()
+
+        header, offset = BinaryFormat.decode_header(buffer)
+        self.file_dtypes = [np.dtype(dtype) for dtype in header['column_dtypes']]
+        self.column_names = header['column_names']
+        self.column_units = header['column_units']
+        self.column_dtypes = self.file_dtypes
+        self.column_numbers = list(range(len(self.column_names)))
+        if columns is not None:
+            self._select_columns(columns)
+
+        # complete chunks, a chunk being written counts its data points already in the file
+        chunks = list()
+        head_size = BinaryFormat.CHUNK_HEAD_DTYPE.itemsize
+        while offset + head_size <= len(buffer):
+            chunk_head = np.frombuffer(buffer,dtype = BinaryFormat.CHUNK_HEAD_DTYPE,count = 1,offset = offset)[0]
+            if chunk_head['magic'] != BinaryFormat.CHUNK_MAGIC:
+                break
+            column_offsets, chunk_size = BinaryFormat.chunk_layout(int(chunk_head['capacity']),self.file_dtypes)
+            if offset + chunk_size > len(buffer):
+                break
+            chunks.append((offset,column_offsets,int(chunk_head['length'])))
+            offset += chunk_size
+
+        return buffer, header, chunks
+
+    def _chunk_columns(self,buffer,chunk):
+        """ Read-only views of the data of the selected columns in a chunk """
+
+        chunk_offset, column_offsets, length = chunk
+
+        return [np.frombuffer(buffer,dtype = self.file_dtypes[column_number],count = length,offset = chunk_offset + column_offsets[column_number]) for column_number in self.column_numbers]
+
+    def _data_curve(self,header,pieces,rows = None):
+        """ DataContainer of the selected columns
+
+        pieces : list of consecutive parts of the data, each a list with one array per selected column
+        rows : slice of the data points to keep
+        """
+
+        column_dict = dict()
+        for i, (column_name, column_units, dtype) in enumerate(zip(self.column_names,self._column_units_labels(),self.column_dtypes)):
+            if len(pieces) == 1:
+                data = pieces[0][i]
+            elif pieces:
+                data = np.concatenate([piece[i] for piece in pieces])
+            else:
+                data = np.zeros((0,),dtype = dtype)
+            if rows is not None:
+                data = data[rows]
+
+            column = Column(column_name,column_units,dtype = dtype)
+            column.set_data(data,copy = False)
+            column.update_length()
+            column_dict[column_name] = column
+
+        data_curve = DataCurve(column_dict = column_dict)
+        data_curve.set_parameter_dict(header['parameters'])
+
+        return data_curve
+
+def _read_file(reader_factory,file_path,read_kwargs):
+    """ Read one file with a new reader. Used by read_many in the worker processes. """
+
+    return reader_factory().read(file_path,**read_kwargs)
+
+def read_many(file_paths,reader_factory,workers = None,**read_kwargs):
+    """ Read many files in parallel
+
+    file_paths : list of full paths to the data files
+    reader_factory : picklable callable returning a new Reader (ex : a Reader class or a functools.partial)
+    workers : number of worker processes (default os.cpu_count()). With 1, the files are read in this process.
+    read_kwargs : passed to Reader.read (ex : engine, columns, sample_number)
+
+    Return a DataCurveSequence with the DataCurves in the same order as file_paths. The files that 
+    could not be read are left out and their exceptions are stored in the errors dict of the sequence.
+    The DataCurves are sent back from the workers as whole column arrays.
+    """
+
+    data_curve_sequence = DataCurveSequence()
+
+    if workers == 1:
+        for file_path in file_paths:
+            try:
+                data_curve_sequence.add_data_curve(_read_file(reader_factory,file_path,read_kwargs))
+            except Exception as error:
+                data_curve_sequence.add_error(file_path,error)
+
+        return data_curve_sequence
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [executor.submit(_read_file,reader_factory,file_path,read_kwargs) for file_path in file_paths]
+        for file_path, future in zip(file_paths,futures):
+            try:
+                data_curve_sequence.add_data_curve(future.result())
+            except Exception as error:
+                data_curve_sequence.add_error(file_path,error)
 
+    return data_curve_sequence
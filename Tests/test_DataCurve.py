@@ -0,0 +1,312 @@
+import pickle
+
+import numpy as np
+
+from AsciiDataFile.DataContainer import DataCurve
+
+def make_data_curve(number_of_points = 250):
+
+    data_curve = DataCurve(column_names = ['X','Y','Z'],column_units_labels = ['s','m','V'])
+    for i in range(number_of_points):
+        data_curve.add_data_point([i,i**2,-i])
+
+    return data_curve
+
+def test_contiguous_storage():
+
+    data_curve = make_data_curve()
+    values = data_curve.get_values_array()
+
+    assert values.shape == (250,3)
+    assert np.shares_memory(values,data_curve.X)
+    assert data_curve.get_values_array() is values
+    np.testing.assert_array_equal(data_curve.Y,np.arange(250)**2)
+
+    data_curve.sort_by('Z')
+    np.testing.assert_array_equal(data_curve.X,np.arange(250)[::-1])
+    assert np.shares_memory(data_curve.get_values_array(),data_curve.Z)
+
+    data_curve_pickled = pickle.loads(pickle.dumps(data_curve))
+    np.testing.assert_array_equal(data_curve_pickled.get_values_array(),data_curve.get_values_array())
+    assert np.shares_memory(data_curve_pickled.get_values_array(),data_curve_pickled.Y)
+
+    data_curve.update_column('Y',np.zeros(250))
+    assert not np.shares_memory(data_curve.get_values_array(),values)
+    np.testing.assert_array_equal(data_curve.get_values_array()[:,1],0)
+
+def test_add_data_points():
+
+    data_curve = make_data_curve(0)
+    capacities = set()
+    for i in range(10000):
+        data_curve.add_data_point({'X' : i,'Y' : i**2,'Z' : -i})
+        capacities.add(data_curve.extend_data_length)
+    assert len(capacities) < 10
+
+    data_curve.add_data_points({'X' : np.arange(5),'Y' : np.ones(5),'Z' : np.zeros(5)})
+    data_curve.add_data_points(np.ones((3,3)))
+    assert data_curve.data_length == 10008
+    np.testing.assert_array_equal(data_curve.X[-8:],[0,1,2,3,4,1,1,1])
+    np.testing.assert_array_equal(data_curve.Z[9998:10002],[-9998,-9999,0,0])
+
+def test_mixed_dtypes_storage():
+
+    data_curve = DataCurve(column_names = ['X','status','Y'],column_units_labels = ['s','','m'],column_dtypes = [None,'int32',None])
+    data_curve.add_data_points(np.column_stack((np.arange(5),np.arange(5)*2,np.arange(5)**2)))
+    data_curve.add_data_point([5,10,25])
+    assert data_curve._is_packed() and len(data_curve._blocks) == 2
+    assert data_curve.get_column_dtypes() == [np.float64,np.int32,np.float64]
+    assert np.may_share_memory(data_curve.X,data_curve.Y)
+
+    data_curve.sort_by('Y')
+    data_curve.sort_by('status')
+    np.testing.assert_array_equal(data_curve.status,np.arange(6)*2)
+    data_curve_selected = data_curve.query().range('X',(0.5,3.5)).select(['Y','status']).collect()
+    assert data_curve_selected.get_column_dtypes() == [np.float64,np.int32]
+    np.testing.assert_array_equal(data_curve_selected.status,[2,4,6])
+
+    data_curve_pickled = pickle.loads(pickle.dumps(data_curve))
+    assert data_curve_pickled._is_packed()
+    np.testing.assert_array_equal(data_curve_pickled.get_values_array(),data_curve.get_values_array())
+    np.testing.assert_array_equal(data_curve.get_values_array(),np.column_stack((data_curve.X,data_curve.status,data_curve.Y)))
+
+    data_curve_joined = DataCurve.concat([data_curve,data_curve_pickled])
+    assert data_curve_joined._is_packed() and data_curve_joined.status.dtype == np.int32
+    np.testing.assert_array_equal(data_curve_joined.Y,np.tile(np.arange(6)**2,2))
+    np.testing.assert_allclose(data_curve.interpolate('X',[0.5]).status,[1])
+
+def test_view_selections():
+
+    data_curve = make_data_curve()
+    data_curve.get_values_array()
+
+    data_curve_range = data_curve.select_range('X',[99.5,199.5],new_curve = True)
+    assert data_curve_range.data_length == 100
+    assert np.shares_memory(data_curve_range.Y,data_curve.Y)
+    assert not data_curve_range.Y.flags.writeable
+
+    data_curve_even = data_curve_range.filter(data_curve_range.X % 2 == 0,new_curve = True)
+    assert data_curve_even.column_dict['Z'].is_view()
+    assert data_curve_even.column_dict['Z']._base is data_curve_range.column_dict['Z']._base
+    np.testing.assert_array_equal(data_curve_even.X,np.arange(100,200,2))
+
+    data_curve_range.filter(data_curve_range.X < 150)
+    assert data_curve_range.data_length == 50
+    assert np.shares_memory(data_curve_range.Y,data_curve.Y)
+
+    data_curve_even.add_data_point([0,0,0])
+    assert not data_curve_even.column_dict['Z'].is_view()
+    np.testing.assert_array_equal(data_curve_even.X[-2:],[198,0])
+    np.testing.assert_array_equal(data_curve.X,np.arange(250))
+
+    data_curve_copy = data_curve_range.copy()
+    data_curve_copy.X[0] = -1
+    assert data_curve.X[100] == 100
+
+    data_curve_pickled = pickle.loads(pickle.dumps(data_curve_range))
+    np.testing.assert_array_equal(data_curve_pickled.Z,data_curve_range.Z)
+
+    data_curve_start = data_curve_range.filter(data_curve_range.X < 120,new_curve = True)
+    values = data_curve.get_values_array()
+    assert not data_curve_range.column_dict['Y'].is_view()
+    assert not data_curve_range.column_dict['X'].is_view()
+    values[:] = 0
+    np.testing.assert_array_equal(data_curve_range.X,np.arange(100,150))
+    np.testing.assert_array_equal(data_curve_range.Y,np.arange(100,150)**2)
+    np.testing.assert_array_equal(data_curve_start.Z,-np.arange(100,120))
+
+def test_average_multiple_measurement():
+
+    data_curve = DataCurve(column_names = ['field','signal'],column_units_labels = ['T','V'])
+    data_curve.add_data_points(np.array([[0.02,1],[-0.03,3],[0.98,2],[1.04,6],[1.01,1],[2.5,4]]))
+
+    data_curve_averaged = data_curve.average_multiple_measurement('field',1,['mean','count','median','max'],new_curve = True)
+    assert data_curve_averaged.get_column_names() == ['field','signal','count','field median','signal median','field max','signal max']
+    np.testing.assert_allclose(data_curve_averaged.signal,[2,3,4])
+    np.testing.assert_array_equal(data_curve_averaged.count,[2,3,1])
+    np.testing.assert_allclose(data_curve_averaged.signal_median,[2,2,4])
+    np.testing.assert_allclose(data_curve_averaged.field_max,[0.02,1.04,2.5])
+    assert data_curve.data_length == 6
+
+    data_curve.average_multiple_measurement('field',1)
+    np.testing.assert_allclose(data_curve.field,[-0.005,1.01,2.5])
+
+    data_curve = DataCurve(column_names = ['field','signal'],column_units_labels = ['T','V'])
+    data_curve.add_data_points(np.array([[np.nan,5],[0.02,1],[np.nan,7],[-0.03,3],[1.04,6]]))
+    data_curve_averaged = data_curve.average_multiple_measurement('field',1,['mean','count'],new_curve = True)
+    np.testing.assert_array_equal(data_curve_averaged.count,[2,1,0])
+    np.testing.assert_allclose(data_curve_averaged.signal,[2,6,np.nan])
+    data_curve.set_index('field')
+    assert data_curve.select_value('field',np.nan,1,new_curve = True).data_length == 0
+    np.testing.assert_array_equal(data_curve.select_value('field',0,0.5,new_curve = True).signal,[1,3])
+
+def test_interpolate():
+
+    data_curve = DataCurve(column_names = ['T','R1','R2'],column_units_labels = ['K','Ohm','Ohm'])
+    data_curve.add_data_points(np.array([[3,30,-3],[1,10,-1],[2,20,-2],[4,40,-4]]))
+
+    x_values = np.array([0.5,1.5,2.25,5])
+    data_curve_interpolated = data_curve.interpolate('T',x_values)
+    np.testing.assert_allclose(data_curve_interpolated.R1,[5,15,22.5,50])
+    np.testing.assert_allclose(data_curve_interpolated.R2,[-0.5,-1.5,-2.25,-5])
+    np.testing.assert_allclose(data_curve.y_at_x('T','R2',2.5),-2.5)
+
+    locator = data_curve.column_dict['T'].linear_locator(x_values)
+    assert data_curve.column_dict['T'].linear_locator(x_values.copy()) is locator
+    data_curve.add_data_point([5,60,-6])
+    assert not data_curve.column_dict['T'].linear_locator(x_values) is locator
+    np.testing.assert_allclose(data_curve.y_at_x('T','R1',x_values),[5,15,22.5,60])
+
+    data_curve.symetrize('T',['R1'],['R2'],x_values = np.array([1,2]))
+    np.testing.assert_allclose(data_curve.R1,[0,0])
+    np.testing.assert_allclose(data_curve.R2,[-1,-2])
+
+def test_indexed_selections():
+
+    data_curve = DataCurve(column_names = ['T','R'],column_units_labels = ['K','Ohm'])
+    temperature = np.round(np.random.default_rng(0).uniform(0,10,1000),1)
+    data_curve.add_data_points(np.column_stack((temperature,np.arange(1000))))
+    data_curve_indexed = data_curve.copy()
+    data_curve_indexed.set_index('T')
+
+    for limits in [(2,3),(-1,0.1),(9.95,20),(5,5)]:
+        np.testing.assert_array_equal(data_curve_indexed.select_range('T',limits,new_curve = True).R,data_curve.select_range('T',limits,new_curve = True).R)
+    for value, tolerance in [(0.3,0.1),(0.3,0.01),(0.5,0.2),(5,1),(7,3),(11,0.5)]: # many values at value +- tolerance
+        np.testing.assert_array_equal(data_curve_indexed.select_value('T',value,tolerance,new_curve = True).R,data_curve.select_value('T',value,tolerance,new_curve = True).R)
+
+    data_curve_indexed.sort_by('T')
+    assert isinstance(data_curve_indexed.column_dict['T'].range_rows((2,3)),slice)
+    assert np.all(np.diff(data_curve_indexed.select_range('T',(2,3),new_curve = True).T) >= 0)
+
+def test_query():
+
+    data_curve = make_data_curve(100)
+    data_curve.add_column('label','',np.arange(100,dtype = np.int32))
+
+    query = data_curve.query().range('X',(10,60)).value('Y',900,500).sort('Z').select(['X','label'])
+    assert 'combined mask' in query.explain()
+
+    data_curve_selected = query.collect()
+    np.testing.assert_array_equal(data_curve_selected.X,np.arange(37,20,-1))
+    np.testing.assert_array_equal(data_curve_selected.label,data_curve_selected.X)
+    assert data_curve_selected.get_column_names() == ['X','label']
+
+    data_curve_view = data_curve.query().direction('Z',-1).collect(view = True)
+    assert data_curve_view.data_length == 100
+    assert np.shares_memory(data_curve_view.Y,data_curve.Y)
+
+    data_curve = make_data_curve(100)
+    data_curve._pack()
+    assert data_curve._is_packed()
+    data_curve_selected = data_curve.query().range('X',(10,20)).select(['Z','X']).collect()
+    np.testing.assert_array_equal(data_curve_selected.get_values_array(),np.column_stack((-np.arange(11,20),np.arange(11,20))))
+    data_curve_selected = data_curve.query().value('Y',900,500).sort('Z').select(['Z','X']).collect()
+    np.testing.assert_array_equal(data_curve_selected.X,np.arange(37,20,-1))
+    np.testing.assert_array_equal(data_curve_selected.Z,-data_curve_selected.X)
+
+def test_packed_data_curve_sequence():
+
+    from AsciiDataFile.DataContainer import DataCurveSequence
+
+    data_curves = list()
+    for i in range(4):
+        data_curve = DataCurve(column_names = ['T','R'],column_units_labels = ['K','Ohm'])
+        data_curve.add_data_points(np.column_stack((np.arange(3*i)[::-1],np.arange(3*i) + 10*i)))
+        data_curve.add_parameter('sweep',i)
+        data_curves.append(data_curve)
+
+    data_curve_sequence = DataCurveSequence(data_curves)
+    data_curve_sequence.pack()
+    assert len(data_curve_sequence) == 4
+    np.testing.assert_array_equal(data_curve_sequence.get_curve_lengths(),[0,3,6,9])
+    assert data_curve_sequence[2].parameter_dict['sweep'] == 2
+    np.testing.assert_array_equal(data_curve_sequence[2].R,data_curves[2].R)
+    assert np.shares_memory(data_curve_sequence[3].T,data_curve_sequence.get_column_data('T'))
+
+    statistics = data_curve_sequence.reduce(['mean','max','count'])
+    np.testing.assert_allclose(statistics.R,[np.nan,11,22.5,34],equal_nan = True)
+    np.testing.assert_array_equal(statistics.T_max[1:],[2,5,8])
+    np.testing.assert_array_equal(statistics.count,[0,3,6,9])
+
+    data_curve_sequence.select_range('T',(0.5,4.5))
+    np.testing.assert_array_equal(data_curve_sequence.get_curve_lengths(),[0,2,4,4])
+    data_curve_sequence.sort_by('T')
+    np.testing.assert_array_equal(data_curve_sequence[3].T,[1,2,3,4])
+    np.testing.assert_array_equal(data_curve_sequence[3].R,[37,36,35,34])
+
+def test_concat():
+
+    data_curves = [make_data_curve(n) for n in [3,0,5]]
+    data_curves[2].add_parameter('field',1)
+
+    data_curve = DataCurve.concat(data_curves,source_column_name = 'source')
+    assert data_curve.get_column_names() == ['X','Y','Z','source']
+    np.testing.assert_array_equal(data_curve.X,[0,1,2,0,1,2,3,4])
+    np.testing.assert_array_equal(data_curve.source,[0,0,0,2,2,2,2,2])
+    assert DataCurve.concat(data_curves)._is_packed()
+
+    other = make_data_curve(2)
+    other.rename_column('Z','W')
+    try:
+        DataCurve.concat([data_curves[0],other])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('Different column names must raise a ValueError')
+
+    data_curves[0].append(data_curves[2])
+    np.testing.assert_array_equal(data_curves[0].Y,[0,1,4,0,1,4,9,16])
+
+def test_executor(monkeypatch):
+
+    from concurrent.futures import ThreadPoolExecutor
+    from AsciiDataFile import DataContainer
+
+    monkeypatch.setattr(DataContainer,'ROWS_PER_TASK',64)
+    monkeypatch.setattr(DataContainer,'PARALLEL_MIN_BYTES',0)
+
+    rng = np.random.default_rng(0)
+    data_curve = DataCurve(column_names = ['T','A','B','C','D','E','F'],column_units_labels = ['K'] + [''] * 6,column_dtypes = [None,None,'int32',None,None,None,None])
+    data_curve.add_data_points(np.column_stack((np.round(rng.uniform(0,10,500),2),rng.random(500),rng.integers(0,100,500),rng.random((500,4)))))
+
+    def run(executor,packed):
+
+        data_curve_run = data_curve.copy()
+        data_curve_run.set_executor(executor)
+        data_curve_run.filter(data_curve_run.T > 1)
+        if packed:
+            data_curve_run.get_values_array()
+            assert data_curve_run._is_packed()
+        data_curve_run.filter(data_curve_run.A > 0.1)
+        assert data_curve_run._is_packed() == packed
+        data_curve_run.sort_by('A')
+        averaged = data_curve_run.average_multiple_measurement('T',0.5,['mean','std','median'],new_curve = True)
+        selected = data_curve_run.query().range('T',(2,8)).select(['F','B','T']).collect()
+        interpolated = data_curve_run.interpolate('T',np.linspace(0,10,133))
+        data_curve_run.symetrize('T',['A'],['C'],x_step = 0.5)
+
+        return [averaged,interpolated,selected,data_curve_run]
+
+    with ThreadPoolExecutor(4) as executor:
+        for packed in [False,True]:
+            for result, result_threaded in zip(run(None,packed),run(executor,packed)):
+                assert result.get_column_names() == result_threaded.get_column_names()
+                for column_name in result.get_column_names():
+                    np.testing.assert_array_equal(result.get_column_data(column_name),result_threaded.get_column_data(column_name))
+
+def test_cache_after_in_place_edit():
+
+    data_curve = DataCurve(column_names = ['T','R'],column_units_labels = ['K','Ohm'])
+    data_curve.add_data_points(np.array([[1.,1.],[2.,2.],[3.,3.],[4.,4.]]))
+    data_curve.set_index('T')
+
+    np.testing.assert_array_equal(data_curve.y_at_x('T','R',[2.5]),[2.5])
+    np.testing.assert_array_equal(data_curve.select_range('T',(1.5,3.5),new_curve = True).R,[2,3])
+
+    data_curve.get_column_data('T')[:] += 1
+    data_curve.invalidate(['T'])
+    np.testing.assert_array_equal(data_curve.y_at_x('T','R',[2.5]),[1.5])
+    np.testing.assert_array_equal(data_curve.select_range('T',(1.5,3.5),new_curve = True).R,[1,2])
+
+    data_curve.add_data_point([2.,5.])
+    np.testing.assert_array_equal(data_curve.select_range('T',(1.5,3.5),new_curve = True).R,[1,2,5])
@@ -0,0 +1,393 @@
+import os
+from os import path
+
+import numpy as np
+import pytest
+
+from AsciiDataFile import Readers
+
+data_path = path.join(path.dirname(__file__),'..','Examples','data')
+
+def assert_same_data_curve(data_curve1,data_curve2):
+
+    assert data_curve1.get_column_names() == data_curve2.get_column_names()
+    assert data_curve1.get_column_unitss() == data_curve2.get_column_unitss()
+    for column_name in data_curve1.get_column_names():
+        np.testing.assert_array_equal(data_curve1.get_column_data(column_name),data_curve2.get_column_data(column_name))
+
+def test_block_engine(tmp_path):
+
+    cases = [
+        (Readers.SQUIDDataReader,'20171003_NiFe_ech1_MvsH_500eO_001.dc.dat'),
+        (Readers.PPMSResistivityDataReader,'20181108_RvsT_3CH_Side1.dat'),
+        (Readers.PPMSHeatCapacityDataReader,'Add-135-15Feb2019-1.dat'),
+        (Readers.MDDataFileReader,'20180711_44.0K.txt'),
+        (Readers.DataColumnReader,'test_column.txt'),
+        ]
+
+    for reader_class, data_file in cases:
+        file_path = path.join(data_path,data_file)
+        data_curve_line = reader_class().read(file_path,engine = 'line')
+        data_curve_block = reader_class().read(file_path,engine = 'block')
+        assert_same_data_curve(data_curve_line,data_curve_block)
+
+    # a regular expression separator matching the new line adds an empty last field
+    file_path = str(tmp_path / 'whitespace.txt')
+    with open(file_path,'w') as f_id:
+        f_id.write('1  2\n3\n4  5\n6')
+    reader = Readers.GenericDataReader(r'\s+',['a','b'],['',''])
+    data_curve_line = reader.read(file_path,engine = 'line')
+    np.testing.assert_array_equal(data_curve_line.a,[1,3,4])
+    np.testing.assert_array_equal(data_curve_line.b,[2,0,5])
+    for engine in ['block','mmap']:
+        assert_same_data_curve(data_curve_line,reader.read(file_path,engine = engine))
+
+def test_block_engine_small_blocks():
+
+    reader = Readers.GenericDataReader(' ',['angle','signal'],['deg','count'])
+    reader.block_size = 97
+    file_path = path.join(data_path,'XRD_T2T_dataFile.dat')
+
+    assert_same_data_curve(Readers.GenericDataReader(' ',['angle','signal'],['deg','count']).read(file_path),reader.read(file_path,engine = 'block'))
+
+def test_mmap_engine():
+
+    file_path = path.join(data_path,'20181108_RvsT_3CH_Side1.dat')
+    data_curve_mapped = Readers.PPMSResistivityDataReader().read(file_path,engine = 'mmap')
+
+    assert not data_curve_mapped.column_dict['temperature'].is_loaded()
+    assert data_curve_mapped.get_column_dtypes() == [np.float64] * data_curve_mapped.column_number()
+    assert not data_curve_mapped.column_dict['temperature'].is_loaded()
+    data_curve_mapped.temperature
+    assert data_curve_mapped.column_dict['temperature'].is_loaded()
+    assert not data_curve_mapped.column_dict['resistance1'].is_loaded()
+
+    assert_same_data_curve(Readers.PPMSResistivityDataReader().read(file_path),data_curve_mapped)
+
+def test_column_selection():
+
+    file_path = path.join(data_path,'20181108_RvsT_3CH_Side1.dat')
+    data_curve = Readers.PPMSResistivityDataReader().read(file_path)
+
+    for engine in ['line','block','mmap']:
+        data_curve_selected = Readers.PPMSResistivityDataReader().read(file_path,engine = engine,columns = ['temperature',5])
+        assert data_curve_selected.get_column_names() == ['temperature','current1']
+        assert data_curve_selected.get_column_unitss() == ['K','uA']
+        for column_name in data_curve_selected.get_column_names():
+            np.testing.assert_array_equal(data_curve.get_column_data(column_name),data_curve_selected.get_column_data(column_name))
+
+def test_read_many():
+
+    file_paths = [path.join(data_path,data_file) for data_file in ['test_column.txt','missing_file.txt','test_column_wu.txt']]
+
+    for workers in [1,2]:
+        data_curve_sequence = Readers.read_many(file_paths,Readers.DataColumnReader,workers = workers,engine = 'mmap')
+
+        assert len(data_curve_sequence) == 2
+        assert list(data_curve_sequence.errors) == [file_paths[1]]
+        assert_same_data_curve(data_curve_sequence[1],Readers.DataColumnReader().read(file_paths[2]))
+
+def test_iter_chunks():
+
+    reader = Readers.GenericDataReader(' ',['angle','signal'],['deg','count'])
+    reader.block_size = 1000
+    file_path = path.join(data_path,'XRD_T2T_dataFile.dat')
+
+    data_curves = list(reader.iter_chunks(file_path,chunk_rows = 3000))
+    assert [data_curve.data_length for data_curve in data_curves] == [3000,3000,1001]
+
+    data_curve = reader.read(file_path)
+    for column_name in data_curve.get_column_names():
+        np.testing.assert_array_equal(data_curve.get_column_data(column_name),np.concatenate([chunk.get_column_data(column_name) for chunk in data_curves]))
+
+def test_hot_reader_follow(tmp_path):
+
+    from AsciiDataFile.HotReader import HotReader
+
+    file_path = str(tmp_path / 'hot.txt')
+    with open(file_path,'w') as f_id:
+        f_id.write('X (s),Y (m)\n1,2\n3,4\n')
+
+    hot_reader = HotReader(Readers.DataColumnReader(),file_path)
+    assert hot_reader.data_curve.data_length == 2
+
+    with open(file_path,'a') as f_id:
+        f_id.write('5,6\n7,8\n9,')
+    assert hot_reader.follow() == 2
+    assert hot_reader.follow() == 0
+
+    with open(file_path,'a') as f_id:
+        f_id.write('10\n')
+    assert hot_reader.follow() == 1
+    np.testing.assert_array_equal(hot_reader.data_curve.Y,[2,4,6,8,10])
+
+    with open(file_path,'w') as f_id:
+        f_id.write('X (s),Y (m)\n11,12\n')
+    assert hot_reader.follow() == 1
+    np.testing.assert_array_equal(hot_reader.data_curve.X,[11])
+
+def test_sidecar_cache(tmp_path):
+
+    from AsciiDataFile.Cache import SidecarCache
+
+    cache = SidecarCache(str(tmp_path / 'cache'))
+    file_path = str(tmp_path / 'data.txt')
+    with open(file_path,'w') as f_id:
+        f_id.write('X (s),Y (m)\n1,2\n3,4\n')
+
+    reader = Readers.DataColumnReader()
+    data_curve = reader.read(file_path,cache = cache)
+    data_curve_cached = reader.read(file_path,cache = cache)
+    assert isinstance(data_curve_cached.column_dict['X'].data.base,np.memmap)
+    assert_same_data_curve(data_curve,data_curve_cached)
+    data_curve_cached.X[0] = 10 # copy-on-write, the entry is unchanged
+    data_curve_cached.sort_by('X')
+    np.testing.assert_array_equal(reader.read(file_path,cache = cache).X,[1,3])
+
+    data_curve_selected = reader.read(file_path,cache = cache,columns = ['Y'])
+    assert data_curve_selected.get_column_names() == ['Y']
+
+    with open(file_path,'a') as f_id:
+        f_id.write('5,6\n')
+    assert reader.read(file_path,cache = cache).data_length == 3
+
+    os.remove(file_path)
+    assert cache.load(file_path,reader.get_configuration()) is None
+    assert cache.size() == 0
+
+    reader.read(path.join(data_path,'test_column.txt'),cache = cache)
+    cache.max_size = 0
+    cache.evict()
+    assert cache.size() == 0
+
+def test_shared_sidecar_cache(tmp_path):
+
+    from AsciiDataFile.Cache import SidecarCache, TEMPORARY_PREFIX
+
+    cache = SidecarCache(str(tmp_path / 'cache'),max_size = 2000) # entries evicted while the workers read
+    file_paths = [str(tmp_path / 'data_{0:d}.txt'.format(i)) for i in range(40)]
+    for i, file_path in enumerate(file_paths):
+        with open(file_path,'w') as f_id:
+            f_id.write('X (s),Y (m)\n' + ''.join('{0:d},{1:d}\n'.format(j,i) for j in range(20)))
+
+    for _ in range(2):
+        data_curve_sequence = Readers.read_many(file_paths,Readers.DataColumnReader,workers = 4,cache = cache)
+        assert len(data_curve_sequence) == 40 and not data_curve_sequence.errors
+        np.testing.assert_array_equal(data_curve_sequence[39].Y,[39] * 20)
+
+    temporary_path = os.path.join(cache.cache_dir,TEMPORARY_PREFIX + 'entry') # entry being written
+    os.makedirs(temporary_path)
+    with open(os.path.join(temporary_path,'meta.json'),'w') as f_id:
+        f_id.write('{}')
+    cache.clear()
+    assert os.path.isdir(temporary_path)
+
+    os.remove(file_paths[0])
+    cache.store(file_paths[0],Readers.DataColumnReader().get_configuration(),data_curve_sequence[0]) # no error
+    assert cache.size() == 0
+
+def test_read_rows(tmp_path):
+
+    from AsciiDataFile.Cache import SidecarCache
+
+    file_path = path.join(data_path,'20181108_RvsT_3CH_Side1.dat')
+    data_curve = Readers.PPMSResistivityDataReader().read(file_path)
+
+    for cache in [False,SidecarCache(str(tmp_path / 'cache'))]:
+        for rows in [slice(10,20),slice(-5,None),slice(0,100,7),slice(50,10,-3),slice(2000,3000)]:
+            data_curve_rows = Readers.PPMSResistivityDataReader().read(file_path,rows = rows,cache = cache,columns = ['temperature','resistance2'])
+            for column_name in data_curve_rows.get_column_names():
+                np.testing.assert_array_equal(data_curve.get_column_data(column_name)[rows],data_curve_rows.get_column_data(column_name))
+
+    for content in ['','X (s),Y (m)\n']:
+        empty_file_path = str(tmp_path / 'empty.txt')
+        with open(empty_file_path,'w') as f_id:
+            f_id.write(content)
+        for engine in ['line','block','mmap']:
+            for rows in [None,slice(0,10)]:
+                assert Readers.DataColumnReader().read(empty_file_path,engine = engine,rows = rows,cache = False).data_length == 0
+
+def test_carriage_return_line_ends(tmp_path):
+
+    from AsciiDataFile.Cache import SidecarCache
+
+    file_path = str(tmp_path / 'data.txt')
+    for content in [b'X (s),Y (m)\r1,2\r3,4\r5,6\r',b'X (s),Y (m)\n1,2\r3,4\r5,6\r']:
+        with open(file_path,'wb') as f_id:
+            f_id.write(content)
+        for engine in ['line','block','mmap']:
+            data_curve = Readers.DataColumnReader().read(file_path,engine = engine)
+            assert data_curve.get_column_names() == ['X','Y']
+            np.testing.assert_array_equal(data_curve.X,[1,3,5])
+            np.testing.assert_array_equal(data_curve.Y,[2,4,6])
+
+    for cache in [False,SidecarCache(str(tmp_path / 'cache'))]:
+        np.testing.assert_array_equal(Readers.DataColumnReader().read(file_path,rows = slice(0,3),cache = cache).X,[1,3,5])
+        np.testing.assert_array_equal(Readers.DataColumnReader().read(file_path,rows = slice(1,None),cache = cache).Y,[4,6])
+
+    reader = Readers.DataColumnReader()
+    with pytest.raises(IndexError):
+        reader.read(file_path,rows = 10)
+    assert reader.f_id.closed
+
+def test_header_layout_cache(tmp_path,monkeypatch):
+
+    file_paths = [str(tmp_path / 'data{0:d}.txt'.format(i)) for i in range(3)]
+    for i, file_path in enumerate(file_paths):
+        with open(file_path,'w') as f_id:
+            f_id.write('X (s),Y (m){{int32}}\n{0:d},2\n3,4\n'.format(i))
+
+    parsed_headers = list()
+    parse_header = Readers.DataColumnReader._parse_header
+    monkeypatch.setattr(Readers.DataColumnReader,'_parse_header',lambda self, header: parsed_headers.append(header) or parse_header(self,header))
+    monkeypatch.setattr(Readers,'_layouts',dict())
+
+    data_curves = [Readers.DataColumnReader().read(file_path) for file_path in file_paths]
+    assert len(parsed_headers) == 1
+    assert [data_curve.X[0] for data_curve in data_curves] == [0,1,2]
+    assert data_curves[2].get_column_unitss() == ['s','m']
+    assert data_curves[2].Y.dtype == np.int32
+
+    with open(file_paths[0],'w') as f_id:
+        f_id.write('[Header]\nno data part\n')
+    assert Readers.SQUIDDataReader().read(file_paths[0]).data_length == 0
+
+def test_header_blocks(monkeypatch):
+
+    readers_files = [
+        (Readers.MDDataFileReader,'20180711_44.0K.txt'),
+        (Readers.PPMSResistivityDataReader,'20181108_RvsT_3CH_Side1.dat'),
+        (lambda: Readers.GenericDataReader(' ',['angle','signal'],['deg','count'],nb_head_lines = 2),'XRD_T2T_dataFile.dat'),
+        (Readers.DataColumnReader,'test_column_wu.txt'),
+        ]
+    data_curves = [reader().read(path.join(data_path,file_name)) for reader, file_name in readers_files]
+
+    monkeypatch.setattr(Readers.Reader,'header_block_size',3) # the header scan resumes at every block
+    monkeypatch.setattr(Readers,'_layouts',dict())
+    for data_curve, (reader, file_name) in zip(data_curves,readers_files):
+        assert_same_data_curve(data_curve,reader().read(path.join(data_path,file_name)))
+
+def test_compressed_files(tmp_path):
+
+    import bz2, gzip, lzma, shutil
+    from AsciiDataFile.HotReader import HotReader
+
+    file_path = path.join(data_path,'20181108_RvsT_3CH_Side1.dat')
+    data_curve = Readers.PPMSResistivityDataReader().read(file_path)
+
+    for compression_open, extension in [(gzip.open,'.gz'),(bz2.open,'.bz2'),(lzma.open,'.xz')]:
+        compressed_file_paths = [str(tmp_path / ('data.dat' + extension)),str(tmp_path / 'data.dat')] # extension and magic bytes
+        for compressed_file_path in compressed_file_paths:
+            with open(file_path,'rb') as f_id, compression_open(compressed_file_path,'wb') as f_id_compressed:
+                shutil.copyfileobj(f_id,f_id_compressed)
+            for engine in ['line','block','mmap']:
+                assert_same_data_curve(data_curve,Readers.PPMSResistivityDataReader().read(compressed_file_path,engine = engine))
+            data_curve_rows = Readers.PPMSResistivityDataReader().read(compressed_file_path,rows = slice(10,20))
+            np.testing.assert_array_equal(data_curve_rows.temperature,data_curve.temperature[10:20])
+
+    file_path = str(tmp_path / 'hot.txt.gz')
+    with gzip.open(file_path,'wt') as f_id:
+        f_id.write('X (s),Y (m)\n1,2\n3,4\n')
+
+    hot_reader = HotReader(Readers.DataColumnReader(),file_path)
+    assert hot_reader.data_curve.data_length == 2
+
+    with gzip.open(file_path,'at') as f_id: # new gzip member
+        f_id.write('5,6\n7,')
+    assert hot_reader.follow() == 1
+    with gzip.open(file_path,'at') as f_id:
+        f_id.write('8\n')
+    assert hot_reader.follow() == 1
+    np.testing.assert_array_equal(hot_reader.data_curve.Y,[2,4,6,8])
+    assert hot_reader._decompressor.position == os.path.getsize(file_path) # the compressed bytes are read once
+
+    member = gzip.compress(b'9,10\n11,12\n')
+    with open(file_path,'ab') as f_id: # gzip member being written
+        f_id.write(member[:-8])
+    assert hot_reader.follow() == 2
+    with open(file_path,'ab') as f_id:
+        f_id.write(member[-8:])
+    assert hot_reader.follow() == 0
+    np.testing.assert_array_equal(hot_reader.data_curve.Y,[2,4,6,8,10,12])
+
+def test_async_reading(tmp_path):
+
+    import asyncio
+    from AsciiDataFile.HotReader import HotReader
+
+    file_paths = [path.join(data_path,data_file) for data_file in ['test_column.txt','test_column_wu.txt']]
+    hot_file_path = str(tmp_path / 'hot.txt')
+    with open(hot_file_path,'w') as f_id:
+        f_id.write('X (s),Y (m)\n1,2\n')
+
+    async def read_and_follow():
+        reader = Readers.DataColumnReader()
+        data_curves = await asyncio.gather(*[reader.aread(file_path,engine = 'block') for file_path in file_paths])
+
+        hot_reader = HotReader(Readers.DataColumnReader(),hot_file_path)
+        new_rows = hot_reader.iter_new_rows(interval = 0.01)
+        with open(hot_file_path,'a') as f_id:
+            f_id.write('3,4\n5,6\n')
+        values = await asyncio.wait_for(new_rows.__anext__(),5)
+        await new_rows.aclose()
+
+        return data_curves, values
+
+    data_curves, values = asyncio.run(read_and_follow())
+    for data_curve, file_path in zip(data_curves,file_paths):
+        assert_same_data_curve(data_curve,Readers.DataColumnReader().read(file_path))
+    np.testing.assert_array_equal(values,[[3,4],[5,6]])
+
+def test_hot_reader_partial_last_line(tmp_path):
+
+    from AsciiDataFile.HotReader import HotReader
+
+    file_path = str(tmp_path / 'hot.txt')
+    with open(file_path,'w') as f_id:
+        f_id.write('X (s),Y (m)\n1,2\n3,')
+
+    hot_reader = HotReader(Readers.DataColumnReader(),file_path)
+    assert hot_reader.data_curve.data_length == 1
+
+    with open(file_path,'a') as f_id:
+        f_id.write('4\n5,6\n')
+    assert hot_reader.follow() == 2
+    np.testing.assert_array_equal(hot_reader.data_curve.Y,[2,4,6])
+
+def test_block_engine_empty_fields(tmp_path):
+
+    file_path = str(tmp_path / 'empty_fields.txt')
+    with open(file_path,'w',newline = '') as f_id:
+        f_id.write(''.join(',{0:d},,{1:d},\r\n'.format(i,2*i) if i % 3 else '{0:d},,{1:d},,\r\n'.format(i,3*i) for i in range(1000)))
+
+    reader = Readers.GenericDataReader(',',['a','b','c','d','e'],['','','','',''])
+    reader.block_size = 1000
+    assert_same_data_curve(reader.read(file_path,engine = 'line'),reader.read(file_path,engine = 'block'))
+
+def test_non_integral_values_in_integer_columns(tmp_path):
+
+    import pytest
+    from AsciiDataFile.HotReader import HotReader
+
+    data_curve = Readers.PPMSHeatCapacityDataReader().read(path.join(data_path,'Add-135-15Feb2019-1.dat'))
+    assert data_curve.get_column('cal correction').dtype == np.float64
+    assert data_curve.get_column('PPMS status').dtype == np.int32
+
+    file_path = str(tmp_path / 'status.txt')
+    with open(file_path,'w') as f_id:
+        f_id.write('1,2\n3,4.5\n')
+    reader = Readers.GenericDataReader(',',['a','status'],['',''],column_dtypes = [None,'int32'])
+    for engine in ['line','block','mmap']:
+        with pytest.warns(UserWarning,match = 'status'):
+            data_curve = reader.read(file_path,engine = engine)
+            np.testing.assert_array_equal(data_curve.status,[2,4.5])
+
+    with open(file_path,'w') as f_id:
+        f_id.write('1,2\n3,4\n')
+    hot_reader = HotReader(Readers.GenericDataReader(',',['a','status'],['',''],column_dtypes = [None,'int32']),file_path)
+    assert hot_reader.data_curve.status.dtype == np.int32
+    with open(file_path,'a') as f_id:
+        f_id.write('5,nan\n')
+    with pytest.warns(UserWarning,match = 'status'):
+        hot_reader.follow()
+    np.testing.assert_array_equal(hot_reader.data_curve.status,[2,4,np.nan])
@@ -0,0 +1,156 @@
+import numpy as np
+
+from AsciiDataFile import Readers, Writers
+from AsciiDataFile.DataContainer import DataCurve
+
+def test_column_dtypes(tmp_path):
+
+    data_curve = DataCurve()
+    data_curve.add_column('X','s',np.linspace(0,1,11))
+    data_curve.add_column('status',None,np.arange(11),dtype = 'uint16')
+    data_curve.add_column('Y','m',np.linspace(0,1,11),dtype = 'float32')
+
+    file_path = str(tmp_path / 'dtypes.txt')
+    writer = Writers.DataColumnWriter(file_path,auto_numbering = False)
+    writer.write_data_curve(data_curve)
+    writer.close()
+
+    with open(file_path) as f_id:
+        assert f_id.readline().split(', ') == ['           X(s)',' status{uint16}','  Y(m){float32}\n']
+
+    data_curve_read = Readers.DataColumnReader().read(file_path)
+    assert data_curve_read.get_column_dtypes() == [np.float64,np.uint16,np.float32]
+    assert data_curve_read.get_column_unitss() == ['s',None,'m']
+    np.testing.assert_array_equal(data_curve_read.status,np.arange(11))
+
+def test_bulk_values_match_data_points(tmp_path):
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(0,1e5,(2000,4))*10.0**rng.integers(-120,120,(2000,4))
+    values[:8,0] = [0,-0.0,np.nan,np.inf,-np.inf,123456789.5,9.9999999995,1e-320]
+
+    for writer_class in [Writers.DataColumnWriter,Writers.MDDataFileWriter]:
+        for writer_kwargs in [dict(),dict(decimal = ','),dict(separator = '\t',column_width = 20),dict(separator = '')]:
+            file_paths = [str(tmp_path / 'bulk.txt'),str(tmp_path / 'points.txt')]
+            writer = writer_class(file_paths[0],auto_numbering = False,**writer_kwargs)
+            writer.block_rows = 300
+            writer._write_values(values)
+            writer.close()
+
+            writer = writer_class(file_paths[1],auto_numbering = False,**writer_kwargs)
+            for data_point in values:
+                writer.add_data_point(data_point)
+            writer.close()
+
+            with open(file_paths[0],'rb') as f_id_bulk, open(file_paths[1],'rb') as f_id_points:
+                assert f_id_bulk.read() == f_id_points.read()
+
+def test_queued_writer(tmp_path):
+
+    import time
+
+    values = np.random.default_rng(1).normal(0,1,(2500,3))
+    file_paths = [str(tmp_path / 'queued.txt'),str(tmp_path / 'direct.txt')]
+
+    writer = Writers.QueuedWriter(Writers.DataColumnWriter(file_paths[0],auto_numbering = False),flush_rows = 1000,flush_interval = None,max_queued = 10)
+    writer.write_header(['X','Y','Z'],['s','m','m'])
+    for data_point in values:
+        writer.add_data_point(data_point)
+    writer.close()
+
+    writer = Writers.DataColumnWriter(file_paths[1],auto_numbering = False)
+    writer.write_header(['X','Y','Z'],['s','m','m'])
+    for data_point in values:
+        writer.add_data_point(data_point)
+    writer.close()
+
+    with open(file_paths[0],'rb') as f_id_queued, open(file_paths[1],'rb') as f_id_direct:
+        assert f_id_queued.read() == f_id_direct.read()
+
+    writer = Writers.QueuedWriter(Writers.DataColumnWriter(file_paths[0],auto_numbering = False),flush_rows = None,flush_interval = 0.01)
+    writer.write_header(['X','Y'],['s','m'])
+    writer.add_data_point([1,2])
+    def number_of_lines():
+        with open(file_paths[0],'rb') as f_id:
+            return f_id.read().count(b'\n')
+
+    # wait for the data line, the file is not read while the header is being written
+    deadline = time.monotonic() + 5
+    while number_of_lines() < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Readers.DataColumnReader().read(file_paths[0]).data_length == 1
+    writer.close()
+
+def test_binary_data_file(tmp_path):
+
+    from os import path
+
+    file_path = path.join(path.dirname(__file__),'..','Examples','data','Add-135-15Feb2019-1.dat')
+    reader = Readers.PPMSHeatCapacityDataReader()
+    data_curve = reader.read(file_path)
+    data_curve.set_parameter_dict({'sample' : 'Add-135'})
+
+    binary_file_path = Writers.convert_to_binary(file_path,reader,str(tmp_path / 'heat_capacity.adfb'))
+    data_curve_read = Readers.BinaryDataReader().read(binary_file_path)
+    assert data_curve_read.get_column_names() == data_curve.get_column_names()
+    assert data_curve_read.get_column_unitss() == data_curve.get_column_unitss()
+    assert data_curve_read.get_column_dtypes() == data_curve.get_column_dtypes()
+    for column_name in data_curve.get_column_names():
+        np.testing.assert_array_equal(data_curve_read.get_column_data(column_name),data_curve.get_column_data(column_name))
+    assert not data_curve_read.column_dict['time'].data.flags.writeable # memory mapped
+
+    data_curve_selected = Readers.BinaryDataReader().read(binary_file_path,columns = ['PPMS status',0],rows = slice(5,20,3))
+    assert data_curve_selected.get_column_names() == ['PPMS status','time']
+    np.testing.assert_array_equal(data_curve_selected.time,data_curve.time[5:20:3])
+
+    writer = Writers.BinaryDataWriter(str(tmp_path / 'data.adfb'),auto_numbering = False)
+    writer.chunk_rows = 3
+    writer.write_header(['X','status'],['s',None],[None,'uint16'],parameter_dict = {'rate' : 2})
+    for i in range(7):
+        writer.add_data_point([i/2,i])
+        data_curve_read = Readers.BinaryDataReader().read(writer.file_name)
+        np.testing.assert_array_equal(data_curve_read.status,np.arange(i + 1))
+    writer.close()
+
+    data_curve_read = Readers.BinaryDataReader().read(writer.file_name)
+    np.testing.assert_array_equal(data_curve_read.X,np.arange(7)/2)
+    assert data_curve_read.status.dtype == np.uint16
+    assert data_curve_read.parameter_dict == {'rate' : 2}
+    assert [len(chunk.X) for chunk in Readers.BinaryDataReader().iter_chunks(writer.file_name,chunk_rows = 4)] == [4,3]
+    chunks = list(Readers.BinaryDataReader().iter_chunks(writer.file_name,chunk_rows = 2,columns = ['status']))
+    assert [chunk.get_column_names() for chunk in chunks] == [['status']] * 4
+    np.testing.assert_array_equal(np.concatenate([chunk.status for chunk in chunks]),np.arange(7))
+    assert not chunks[0].column_dict['status'].data.flags.writeable # view of the map within a file chunk
+
+def test_compressed_writer(tmp_path):
+
+    values = np.random.default_rng(2).normal(0,1,(100,2))
+    for extension in ['.gz','.bz2','.xz']:
+        file_path = str(tmp_path / ('data.txt' + extension))
+        for i in range(2):
+            writer = Writers.DataColumnWriter(file_path)
+            writer.write_header(['X','Y'],['s','m'])
+            writer._write_values(values)
+            writer.close()
+        assert writer.file_name == str(tmp_path / ('data_002.txt' + extension))
+
+        data_curve = Readers.DataColumnReader().read(writer.file_name)
+        np.testing.assert_allclose(data_curve.Y,values[:,1],rtol = 1e-8)
+
+def test_async_writer(tmp_path):
+
+    import asyncio
+
+    file_path = str(tmp_path / 'async.txt')
+
+    async def record():
+        writer = Writers.AsyncWriter(Writers.DataColumnWriter(file_path,auto_numbering = False),max_queued = 4)
+        await writer.write_header(['X','Y'],['s','m'])
+        for i in range(50):
+            await writer.add_data_point([i,2*i])
+        await writer.close()
+
+    asyncio.run(record())
+
+    data_curve = Readers.DataColumnReader().read(file_path)
+    np.testing.assert_array_equal(data_curve.Y,2*np.arange(50))
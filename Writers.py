@@ -1,9 +1,98 @@
 import numpy as np
 from os import path
+import asyncio
+import atexit
+import queue
+import threading
 import time
 import re
 
+from . import BinaryFormat
+from . import Compression
+
+# Characters of the numbers 000 to 999 and powers of 10 used to format values
+_THREE_DIGITS = np.frombuffer(''.join('{0:03d}'.format(i) for i in range(1000)).encode('ascii'),dtype = np.uint8).reshape(1000,3)
+_POWERS_OF_TEN = np.array([float('1e{0:d}'.format(i)) for i in range(110)])
+
+def _format_rows(values,column_width,separator):
+    """ Text of rows of values, each value formatted as '{value:+{column_width}.8e}' and separated by separator.
+    The usual values are formatted with numpy. The rows with other values (nan, inf, 3 digits exponents, 
+    close to a rounding tie) are formatted by Python.
+    """
+
+    values = values.astype(np.float64)
+    magnitudes = np.abs(values)
+
+    with np.errstate(divide = 'ignore',invalid = 'ignore',over = 'ignore'):
+        exponents = np.floor(np.log10(magnitudes))
+        exponents[magnitudes == 0] = 0
+        special = ~np.isfinite(exponents) | (np.abs(exponents) > 98)
+        exponents[special] = 0
+        exponents = exponents.astype(np.int64)
+
+        # log10 can be off by one near the powers of 10
+        for correction in range(2):
+            scaled = _scale(magnitudes,exponents)
+            mantissas = np.rint(scaled)
+            exponents += (mantissas >= 1e9).astype(np.int64) - ((mantissas < 1e8) & (magnitudes > 0))
+        scaled = _scale(magnitudes,exponents)
+        mantissas = np.rint(scaled)
+
+        # the rounding of the scaled value is only trusted away from the ties
+        special |= np.abs(scaled - mantissas) > 0.5 - 1e-6
+    special |= (mantissas >= 1e9) | ((mantissas < 1e8) & (magnitudes > 0)) | (np.abs(exponents) > 99)
+    mantissas[special] = 1e8
+    exponents[special] = 0
+    mantissas = mantissas.astype(np.uint32)
+    exponents = exponents.astype(np.int32)
+
+    separator_bytes = np.frombuffer(separator.encode('utf-8'),dtype = np.uint8)
+    field_width = max(column_width,15)
+    number_of_rows, number_of_columns = values.shape
+    rows = np.empty((number_of_rows,number_of_columns,field_width + len(separator_bytes)),dtype = np.uint8)
+    rows[...,:field_width - 15] = ord(' ')
+    field = rows[...,field_width - 15:field_width]
+    rows[...,field_width:] = separator_bytes
+
+    field[...,0] = np.where(np.signbit(values),ord('-'),ord('+'))
+    high_digits = mantissas//1000000
+    low_digits = mantissas - high_digits*1000000
+    middle_digits = low_digits//1000
+    low_digits -= middle_digits*1000
+    field[...,1] = high_digits//100 + ord('0')
+    field[...,2] = ord('.')
+    field[...,3:5] = _THREE_DIGITS[high_digits,1:]
+    field[...,5:8] = _THREE_DIGITS[middle_digits]
+    field[...,8:11] = _THREE_DIGITS[low_digits]
+    field[...,11] = ord('e')
+    field[...,12] = np.where(exponents < 0,ord('-'),ord('+'))
+    field[...,13:15] = _THREE_DIGITS[np.abs(exponents),1:]
+
+    row_length = number_of_columns*(field_width + len(separator_bytes)) - len(separator_bytes) + 1
+    rows = rows.reshape(number_of_rows,-1)[:,:row_length]
+    rows[:,-1] = ord('\n')
+
+    row_format = separator.replace('%','%%').join(['%+{0:d}.8e'.format(column_width)] * number_of_columns) + '\n'
+    pieces = list()
+    start = 0
+    for row in np.flatnonzero(special.any(axis = 1)):
+        pieces.append(rows[start:row].tobytes().decode('utf-8'))
+        pieces.append(row_format % tuple(values[row].tolist()))
+        start = row + 1
+    pieces.append(rows[start:].tobytes().decode('utf-8'))
+
+    return ''.join(pieces)
+
+def _scale(magnitudes,exponents):
+    """ magnitudes*10**(8 - exponents), with a single rounding """
+
+    shifts = 8 - exponents
+    return np.where(shifts >= 0,magnitudes*_POWERS_OF_TEN[np.clip(shifts,0,109)],magnitudes/_POWERS_OF_TEN[np.clip(-shifts,0,109)])
+
 class Writer(object):
+
+    block_rows = 10000
+
     def __init__(self,file_name,auto_numbering = True,separator = ', ',column_width = 15,decimal = '.'):
         self.file_name = file_name
         self.auto_numbering = auto_numbering
@@ -17,11 +106,16 @@ class Writer(object):
         self._open_file()
 
     def _open_file(self):
+        """ Open the file. A file name ending with .gz, .bz2, .xz or .lzma is compressed while it is written. """
 
         if self.auto_numbering:
             self.check_existing_file()
 
-        self.f_id = open(self.file_name,'w')
+        compression = Compression.compression_of(self.file_name,check_content = False)
+        if compression is None:
+            self.f_id = open(self.file_name,'w')
+        else:
+            self.f_id = Compression.open_file(self.file_name,'wt',compression)
 
     def close(self):
 
@@ -29,8 +123,11 @@ class Writer(object):
 
     def check_existing_file(self):
 
-        new_file_name = self.file_name
-        while path.isfile(new_file_name):
+        # the number is put before the extension of a compression (data_002.txt.gz)
+        new_file_name, compression_extension = path.splitext(self.file_name)
+        if compression_extension.lower() not in Compression.EXTENSIONS:
+            new_file_name, compression_extension = self.file_name, ''
+        while path.isfile(new_file_name + compression_extension):
             m = re.match(r"(.+)_(\d{3}).([^.]+)\Z",new_file_name)
             if m:
                 base_name = m.group(1)
@@ -40,17 +137,18 @@ class Writer(object):
             else:
                 root, ext = path.splitext(new_file_name)
                 new_file_name = root + '_002' + ext
+        new_file_name += compression_extension
 
         print(self.file_name,'-->',new_file_name)
 
         self.file_name = new_file_name
 
-    def write_header(self,column_names,column_units = None):
+    def write_header(self,column_names,column_units = None,column_dtypes = None):
 
         self.column_number = len(column_names)
-        self._write_header(column_names,column_units)
+        self._write_header(column_names,column_units,column_dtypes)
 
-    def _write_header(self,column_names,column_units = None):
+    def _write_header(self,column_names,column_units = None,column_dtypes = None):
         pass # to be defined by writer type
 
     def write_values(self,values):
@@ -67,9 +165,26 @@ class Writer(object):
                 raise()
 
     def _write_values(self,values):
+        """ Write rows of values. The rows are formatted by blocks of block_rows rows, 
+        with the same output as add_data_point for each row. 
+        """
+
+        values = np.asarray(values)
+        if not self.separator or not values.dtype.kind in 'biuf' or values.ndim != 2:
+            for i in range(values.shape[0]):
+                self.add_data_point(values[i,:])
+            return
+
+        if not values.shape[1]:
+            return
 
-        for i in range(values.shape[0]):
-            self.add_data_point(values[i,:])
+        for start in range(0,values.shape[0],self.block_rows):
+            text = _format_rows(values[start:start + self.block_rows],self.column_width,self.separator)
+            if self.decimal == ',':
+                text = text.replace('.',',')
+            self.f_id.write(text)
+
+        self.f_id.flush()
 
     def write(self,column_names,values,column_units = None):
 
@@ -102,13 +217,15 @@ class Writer(object):
 
         column_names = data_curve.get_column_names()
         column_units = data_curve.get_column_unitss()
+        values = data_curve._values_array()
+        column_dtypes = data_curve.get_column_dtypes() # once the lazy columns are loaded
 
-        self._write_header(column_names,column_units)
-        self._write_values(data_curve.get_values_array())
+        self._write_header(column_names,column_units,column_dtypes)
+        self._write_values(values)
 
 class MDDataFileWriter(Writer):
     
-    def write_header(self,column_names,column_units = None):
+    def write_header(self,column_names,column_units = None,column_dtypes = None):
 
         self.f_id.write("{0:s}\n".format(time.strftime("%c")))
         self.f_id.write("[Header]\n")
@@ -124,7 +241,8 @@ class MDDataFileWriter(Writer):
 
 class DataColumnWriter(Writer):
 
-    def _write_header(self,column_names,column_units = None):
+    def _write_header(self,column_names,column_units = None,column_dtypes = None):
+        """ Write the column heads : name(units){dtype}. The dtype is only written when it is not float64. """
 
         head_line = ''
         for i, column_name in enumerate(column_names):
@@ -132,9 +250,363 @@ class DataColumnWriter(Writer):
                 column_str = "{0:s}".format(column_name)
             else:
                 column_str = "{0:s}({1:s})".format(column_name,column_units[i])
+            if column_dtypes is not None and column_dtypes[i] is not None and np.dtype(column_dtypes[i]) != np.float64:
+                column_str += "{{{0:s}}}".format(np.dtype(column_dtypes[i]).name)
             head_line += "{col:>{width}s}{sep:s}".format(col = column_str,width = self.column_width,sep = self.separator)
 
         if head_line:
             self.f_id.write(head_line[:-len(self.separator)] + "\n")
             self.f_id.flush()
-    
+
+class BinaryDataWriter(Writer):
+    """ Writer of binary column files (see BinaryFormat)
+
+    The values are stored with the dtypes of the columns, in chunks of column blocks.
+    add_data_point keeps the data points in memory and writes them every flush_rows data points, 
+    in chunks of chunk_rows data points, so the file can be read during the acquisition.
+    On close, the unused part of the last chunk is removed.
+    """
+
+    chunk_rows = 10000
+    flush_rows = 1
+
+    def __init__(self,file_name,auto_numbering = True):
+
+        self.parameter_dict = dict()
+        self.column_dtypes = list()
+        self._pending = list()
+        self._chunk_offset = None
+
+        Writer.__init__(self,file_name,auto_numbering)
+
+    def _open_file(self):
+
+        if self.auto_numbering:
+            self.check_existing_file()
+
+        self.f_id = open(self.file_name,'wb+')
+
+    def close(self):
+
+        self.flush()
+        self._crop_chunk()
+        self.f_id.close()
+
+    def write_header(self,column_names,column_units = None,column_dtypes = None,parameter_dict = None):
+
+        if parameter_dict is not None:
+            self.parameter_dict = parameter_dict
+        Writer.write_header(self,column_names,column_units,column_dtypes)
+
+    def _write_header(self,column_names,column_units = None,column_dtypes = None):
+
+        if column_units is None:
+            column_units = [None] * len(column_names)
+        if column_dtypes is None:
+            column_dtypes = [None] * len(column_names)
+
+        self.column_number = len(column_names)
+        self.column_dtypes = [BinaryFormat.file_dtype(dtype) for dtype in column_dtypes]
+
+        self.f_id.write(BinaryFormat.encode_header(column_names,column_units,self.column_dtypes,self.parameter_dict))
+        self.f_id.flush()
+
+    def _write_values(self,values):
+
+        self.flush()
+        self._write_columns(list(np.asarray(values).T))
+
+    def add_data_point(self,data_point):
+
+        self._pending.append([value.magnitude if hasattr(value,'units') else value for value in data_point])
+        if len(self._pending) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """ Write the data points kept in memory """
+
+        if self._pending:
+            columns = list(zip(*self._pending))
+            self._pending = list()
+            self._write_columns(columns)
+
+    def write_data_curve(self,data_curve):
+
+        self.parameter_dict = data_curve.parameter_dict
+        column_names = data_curve.get_column_names()
+        columns = [data_curve.get_column_data(column_name) for column_name in column_names]
+
+        self._write_header(column_names,data_curve.get_column_unitss(),[column.dtype for column in columns])
+        self._write_columns(columns)
+
+    def _write_columns(self,columns):
+        """ Append one array of values per column to the chunks """
+
+        if len(columns) != self.column_number:
+            raise ValueError('{0:d} columns given for {1:d} columns in the header'.format(len(columns),self.column_number))
+        if not columns:
+            return
+
+        columns = [np.asarray(column,dtype = dtype) for column, dtype in zip(columns,self.column_dtypes)]
+        number_of_rows = len(columns[0])
+        start = 0
+        while start < number_of_rows:
+            if self._chunk_offset is None or self._chunk_length == self._chunk_capacity:
+                self._new_chunk(max(self.chunk_rows,number_of_rows - start))
+            stop = start + min(self._chunk_capacity - self._chunk_length,number_of_rows - start)
+            for column, dtype, column_offset in zip(columns,self.column_dtypes,self._column_offsets):
+                self.f_id.seek(self._chunk_offset + column_offset + self._chunk_length*dtype.itemsize)
+                self.f_id.write(column[start:stop].tobytes())
+            self.f_id.flush()
+
+            # the data points are counted once their values are in the file
+            self._chunk_length += stop - start
+            self.f_id.seek(self._chunk_offset)
+            self.f_id.write(BinaryFormat.chunk_head(self._chunk_capacity,self._chunk_length))
+            self.f_id.flush()
+            start = stop
+
+    def _new_chunk(self,capacity):
+
+        self.f_id.seek(0,2)
+        self._chunk_offset = self.f_id.tell()
+        self._chunk_capacity = capacity
+        self._chunk_length = 0
+        self._column_offsets, chunk_size = BinaryFormat.chunk_layout(capacity,self.column_dtypes)
+
+        self.f_id.write(BinaryFormat.chunk_head(capacity,0))
+        self.f_id.truncate(self._chunk_offset + chunk_size)
+
+    def _crop_chunk(self):
+        """ Rewrite the last chunk with a capacity equal to its number of data points """
+
+        if self._chunk_offset is None or self._chunk_length == self._chunk_capacity:
+            return
+
+        columns = list()
+        for dtype, column_offset in zip(self.column_dtypes,self._column_offsets):
+            self.f_id.seek(self._chunk_offset + column_offset)
+            columns.append(self.f_id.read(self._chunk_length*dtype.itemsize))
+
+        self.f_id.seek(self._chunk_offset)
+        self.f_id.truncate()
+        if self._chunk_length:
+            capacity = self._chunk_length
+            column_offsets, chunk_size = BinaryFormat.chunk_layout(capacity,self.column_dtypes)
+            self.f_id.write(BinaryFormat.chunk_head(capacity,capacity))
+            for column, column_offset in zip(columns,column_offsets):
+                self.f_id.seek(self._chunk_offset + column_offset)
+                self.f_id.write(column)
+            self.f_id.truncate(self._chunk_offset + chunk_size)
+        self._chunk_offset = None
+
+def convert_to_binary(file_path,reader,binary_file_path = None,**read_kwargs):
+    """ Write the data read by a Reader in a binary data file
+
+    file_path : full path to the data file
+    reader : Reader of the data file
+    binary_file_path : full path to the binary data file (default to file_path with the .adfb extension)
+    read_kwargs : arguments of Reader.read
+
+    Return the path of the binary data file
+    """
+
+    if binary_file_path is None:
+        binary_file_path = path.splitext(file_path)[0] + '.adfb'
+
+    data_curve = reader.read(file_path,**read_kwargs)
+    writer = BinaryDataWriter(binary_file_path,auto_numbering = False)
+    writer.write_data_curve(data_curve)
+    writer.close()
+
+    return writer.file_name
+
+class QueuedWriter(object):
+    """ Writer running in a background thread
+
+    add_data_point puts the data point in a queue and returns. The background thread writes the
+    queued data points by batches with the bulk formatting of the writer and flushes the file every
+    flush_rows data points, flush_interval seconds after the first data point of a batch, and on 
+    flush or close. When the queue is full, add_data_point waits for the thread (back-pressure).
+    The data points queued before close are always written, also when the interpreter exits.
+    """
+
+    def __init__(self,writer,flush_rows = 1000,flush_interval = 0.1,max_queued = 100000):
+        """ Initialize a QueuedWriter
+
+        writer : Writer of the file
+        flush_rows : number of data points written at once (None for no limit)
+        flush_interval : maximal delay in seconds between the queueing and the writing of a data point (None for no limit)
+        max_queued : maximal number of queued data points and calls (0 for no limit)
+        """
+
+        self.writer = writer
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(max_queued)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target = self._run,name = 'QueuedWriter',daemon = True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+
+        batch = list()
+        deadline = None
+        while True:
+            timeout = None
+            if batch and deadline is not None:
+                timeout = max(deadline - time.monotonic(),0)
+            try:
+                function, arguments = self._queue.get(timeout = timeout)
+            except queue.Empty:
+                self._write_batch(batch)
+                continue
+
+            if function is None:
+                batch.append(arguments)
+                if len(batch) == 1 and self.flush_interval is not None:
+                    deadline = time.monotonic() + self.flush_interval
+                if self.flush_rows is not None and len(batch) >= self.flush_rows:
+                    self._write_batch(batch)
+                continue
+
+            self._write_batch(batch)
+            if function == self._stop:
+                return
+            self._call(function,*arguments)
+
+    def _write_batch(self,batch):
+
+        if not batch:
+            return
+
+        data_points = list(batch)
+        del batch[:]
+        if self._error is not None:
+            return # discard the data points to keep the producers running
+
+        try:
+            data_points = [[value.magnitude if hasattr(value,'units') else value for value in data_point] for data_point in data_points]
+            try:
+                values = np.array(data_points,dtype = np.float64)
+            except ValueError: # data points of different lengths
+                values = None
+            if values is None or values.ndim != 2:
+                for data_point in data_points:
+                    self.writer.add_data_point(data_point)
+            else:
+                self.writer._write_values(values)
+        except Exception as error:
+            self._error = error
+
+    def _call(self,function,*arguments):
+
+        try:
+            function(*arguments)
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+
+    def _stop(self):
+        pass
+
+    def _put(self,function,arguments):
+
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise ValueError('The QueuedWriter of {0:s} is closed'.format(self.writer.file_name))
+
+        self._queue.put((function,arguments))
+
+    def add_data_point(self,data_point):
+        """ Queue a data point, waits when the queue is full """
+
+        self._put(None,data_point)
+
+    def write_header(self,column_names,column_units = None,column_dtypes = None):
+        """ Queue the writing of the header, after the data points already queued """
+
+        self._put(self.writer.write_header,(column_names,column_units,column_dtypes))
+
+    def write_data_curve(self,data_curve):
+        """ Queue the writing of a DataCurve, after the data points already queued """
+
+        self._put(self.writer.write_data_curve,(data_curve,))
+
+    def flush(self):
+        """ Write all the queued data points and wait until they are in the file """
+
+        written = threading.Event()
+        self._put(written.set,())
+        written.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """ Write all the queued data points, stop the thread and close the file """
+
+        if self._closed:
+            return
+        self._queue.put((self._stop,()))
+        self._closed = True
+        self._thread.join()
+        atexit.unregister(self.close)
+        self.writer.close()
+        if self._error is not None:
+            raise self._error
+
+class AsyncWriter(object):
+    """ Writer for asyncio programs
+
+    The data points are written by a QueuedWriter. add_data_point only waits, in an executor, 
+    when the queue is full. flush and close wait for the writing thread in an executor.
+    """
+
+    def __init__(self,writer,executor = None,**queued_kwargs):
+        """ Initialize an AsyncWriter
+
+        writer : Writer of the file
+        executor : executor of the waits (default to the event loop default executor)
+        queued_kwargs : arguments of QueuedWriter (flush_rows, flush_interval, max_queued)
+        """
+
+        self.queued_writer = QueuedWriter(writer,**queued_kwargs)
+        self.executor = executor
+
+    async def _run(self,function,*arguments):
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self.executor,function,*arguments)
+
+    async def add_data_point(self,data_point):
+        """ Queue a data point """
+
+        if self.queued_writer._queue.full():
+            await self._run(self.queued_writer.add_data_point,data_point)
+        else:
+            self.queued_writer.add_data_point(data_point)
+
+    async def write_header(self,column_names,column_units = None,column_dtypes = None):
+        """ Queue the writing of the header """
+
+        await self._run(self.queued_writer.write_header,column_names,column_units,column_dtypes)
+
+    async def write_data_curve(self,data_curve):
+        """ Queue the writing of a DataCurve """
+
+        await self._run(self.queued_writer.write_data_curve,data_curve)
+
+    async def flush(self):
+        """ Wait until the queued data points are in the file """
+
+        await self._run(self.queued_writer.flush)
+
+    async def close(self):
+        """ Write the queued data points and close the file """
+
+        await self._run(self.queued_writer.close)
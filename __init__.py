@@ -7,4 +7,7 @@ maxime.dion@me.com
 
 from . import Readers
 from . import Writers
-from . import DataContainer
\ No newline at end of file
+from . import DataContainer
+from . import Cache
+from . import BinaryFormat
+from . import Compression